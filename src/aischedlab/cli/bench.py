@@ -0,0 +1,205 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import platform
+import sys
+import time
+from datetime import datetime
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from aischedlab.core.models import Job
+from aischedlab.core.simengine import ENGINES, SimulationEngine
+from aischedlab.core.strategies import SCHEDULERS
+from aischedlab.dse.cluster_generator import ClusterGenerator, NodeTemplate
+from aischedlab.dse.job_generator import JOB_COLUMNS, JobGenerator
+
+# Number of 8-GPU nodes per cluster size; a quarter as many CPU-only nodes are added
+CLUSTER_SIZES = {"small": 16, "medium": 256, "huge": 4096}
+# Offered GPU load relative to cluster capacity: shallow queues drain, deep queues keep growing
+QUEUE_LOADS = {"shallow": 0.7, "deep": 3.0}
+# Trace length per GPU of the cluster, so deep queues grow on every cluster size
+JOBS_PER_GPU = 4
+SEED = 1234
+
+def build_scenario(cluster_size: str, queue: str, num_jobs: Optional[int] = None, jobs_per_gpu: float = JOBS_PER_GPU):
+    """
+    Build the fixed cluster and job trace of a benchmark scenario.
+
+    :param num_jobs: Fixed trace length; by default ``jobs_per_gpu`` jobs per GPU of the cluster. The queue
+                     of a deep scenario only forms once the trace outgrows the cluster, so a fixed length
+                     leaves large clusters with no queue at all.
+    """
+    gpu_nodes = CLUSTER_SIZES[cluster_size]
+    cluster = ClusterGenerator([
+        NodeTemplate("gpu", gpu_nodes, gpus=8, cpus=128, memory=1024, power_idle=400.0, power_active=3000.0),
+        NodeTemplate("cpu", max(gpu_nodes // 4, 1), gpus=0, cpus=64, memory=256, power_idle=100.0, power_active=400.0),
+    ]).generate(compact=False)
+    if num_jobs is None:
+        num_jobs = max(1, round(jobs_per_gpu * cluster.gpus_total))
+
+    generator = JobGenerator(
+        num_jobs_range=(num_jobs, num_jobs),
+        submit_time_range=(0, 1),
+        duration_range=(1, 1000),
+        gpu_range=(0, 8),
+        cpu_range=(1, 32),
+        memory_range=(1, 256),
+        seed=SEED,
+        arrival="poisson",
+        arrival_rate=1.0,
+        duration_distribution="lognormal",
+        gpu_choices=(0, 1, 2, 4, 8),
+        gpu_weights=(2, 8, 4, 2, 1),
+    )
+    columns = generator.generate_arrays(num_jobs)
+    # Rescale the unit-rate arrivals so the trace offers the scenario's share of the GPU capacity
+    gpu_work = float((columns["gpus"] * columns["duration"]).mean())
+    rate = QUEUE_LOADS[queue] * cluster.gpus_total / gpu_work
+    submit_times = (columns["submit_time"] / rate).tolist()
+    rows = zip(submit_times, *(columns[column].tolist() for column in JOB_COLUMNS[1:]))
+    jobs = [Job(name=f"job_{i}", submit_time=submit_time, duration=duration, gpus=gpus, cpus=cpus, memory=memory)
+            for i, (submit_time, duration, gpus, cpus, memory) in enumerate(rows)]
+    return cluster, jobs
+
+def run_scenario(cluster_size: str, queue: str, scheduler: str, num_jobs: Optional[int], jobs_per_gpu: float,
+                 engine: str) -> dict:
+    """
+    Run one scenario and measure it. Runs in a fresh worker process so peak RSS is per scenario.
+    """
+    cluster, jobs = build_scenario(cluster_size, queue, num_jobs, jobs_per_gpu)
+    sim_engine = SimulationEngine(cluster=cluster, jobs=jobs, scheduler_cls=SCHEDULERS[scheduler], engine=engine)
+    start = time.perf_counter()
+    sim_engine.run(report=False)
+    wall_time = time.perf_counter() - start
+    peak_rss_mb = None
+    if resource is not None:
+        # ru_maxrss is in KB on Linux and in bytes on macOS
+        scale = 1024 ** 2 if sys.platform == "darwin" else 1024
+        peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    return {
+        "scenario": f"{cluster_size}/{queue}/{scheduler}",
+        "cluster": cluster_size,
+        "queue": queue,
+        "scheduler": scheduler,
+        "engine": engine,
+        "nodes": len(cluster.nodes),
+        "jobs": len(jobs),
+        "jobs_completed": sim_engine.jobs_completed,
+        "wall_time_s": wall_time,
+        "events": sim_engine.events_processed,
+        "events_per_s": sim_engine.events_processed / wall_time if wall_time > 0 else 0.0,
+        "jobs_per_s": sim_engine.jobs_completed / wall_time if wall_time > 0 else 0.0,
+        "peak_rss_mb": peak_rss_mb,
+    }
+
+def aggregate_runs(runs: list[dict]) -> dict:
+    """
+    Combine repeated runs of a scenario. Timings come from the fastest run, the least disturbed by other
+    load on the machine; the median wall time and every run's wall time are kept alongside.
+    """
+    fastest = min(runs, key=lambda run: run["wall_time_s"])
+    wall_times = sorted(run["wall_time_s"] for run in runs)
+    middle = len(wall_times) // 2
+    median = wall_times[middle] if len(wall_times) % 2 else (wall_times[middle - 1] + wall_times[middle]) / 2
+    rss = [run["peak_rss_mb"] for run in runs if run["peak_rss_mb"] is not None]
+    return dict(fastest, repeat=len(runs), wall_time_median_s=median,
+                wall_times_s=[run["wall_time_s"] for run in runs], peak_rss_mb=max(rss) if rss else None)
+
+def compare(results: list[dict], baseline: dict, tolerance: float) -> list[str]:
+    """
+    Print wall-time ratios against a baseline file and return the scenarios that regressed.
+    Wall times are the fastest of the repeated runs on both sides.
+    """
+    previous = {result["scenario"]: result for result in baseline["results"]}
+    regressions = []
+    print(f"\n{'scenario':<32} {'baseline s':>11} {'current s':>11} {'ratio':>7}")
+    for result in results:
+        before = previous.get(result["scenario"])
+        if before is None:
+            print(f"{result['scenario']:<32} {'-':>11} {result['wall_time_s']:>11.3f} {'new':>7}")
+            continue
+        if before["jobs"] != result["jobs"]:
+            # Different trace lengths are not comparable
+            print(f"{result['scenario']:<32} {before['wall_time_s']:>11.3f} {result['wall_time_s']:>11.3f} "
+                  f"{'jobs differ':>7}")
+            continue
+        if before.get("engine") != result["engine"]:
+            # Neither are runs on different engines
+            print(f"{result['scenario']:<32} {before['wall_time_s']:>11.3f} {result['wall_time_s']:>11.3f} "
+                  f"{'engine differs':>7}")
+            continue
+        ratio = result["wall_time_s"] / before["wall_time_s"] if before["wall_time_s"] > 0 else float("inf")
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(result["scenario"])
+            flag = "  REGRESSION"
+        print(f"{result['scenario']:<32} {before['wall_time_s']:>11.3f} {result['wall_time_s']:>11.3f} {ratio:>7.2f}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark simulator throughput and memory on fixed synthetic scenarios.")
+    parser.add_argument('--clusters', nargs='+', choices=list(CLUSTER_SIZES), default=list(CLUSTER_SIZES),
+                        help='Cluster sizes to run (default: all).')
+    parser.add_argument('--queues', nargs='+', choices=list(QUEUE_LOADS), default=list(QUEUE_LOADS),
+                        help='Queue depths to run (default: all).')
+    parser.add_argument('--schedulers', nargs='+', choices=list(SCHEDULERS), default=list(SCHEDULERS),
+                        help='Schedulers to run (default: all registered).')
+    parser.add_argument('--jobs-per-gpu', type=float, default=JOBS_PER_GPU,
+                        help=f'Trace length per GPU of the cluster (default: {JOBS_PER_GPU}).')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Fixed number of jobs for every scenario instead of --jobs-per-gpu, e.g. for quick runs.')
+    parser.add_argument('--engine', type=str, choices=ENGINES, default='simpy',
+                        help='Simulation engine to benchmark (default: simpy).')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per scenario; the fastest is reported and compared (default: 3).')
+    parser.add_argument('--output', type=str, default=None,
+                        help='JSON results file (default: bench_YYYYMMDD_HHMMSS.json).')
+    parser.add_argument('--baseline', type=str, default=None,
+                        help='Previous results file to compare against; exits with status 1 on regressions.')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Allowed relative wall-time increase before a scenario counts as a regression (default: 0.1).')
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    # Keep the engine's per-job logging out of the measurements
+    logging.basicConfig(level=logging.WARNING)
+
+    scenarios = [(cluster_size, queue, scheduler, args.jobs, args.jobs_per_gpu, args.engine)
+                 for cluster_size in args.clusters for queue in args.queues for scheduler in args.schedulers]
+    results = []
+    # One fresh process per run so peak RSS and warm caches do not carry over
+    with multiprocessing.get_context("spawn").Pool(processes=1, maxtasksperchild=1) as pool:
+        for scenario in scenarios:
+            result = aggregate_runs([pool.apply(run_scenario, scenario) for _ in range(args.repeat)])
+            results.append(result)
+            rss = f"{result['peak_rss_mb']:.0f} MB" if result["peak_rss_mb"] is not None else "n/a"
+            print(f"{result['scenario']:<32} {result['wall_time_s']:8.3f} s (median {result['wall_time_median_s']:.3f} s)  "
+                  f"{result['events_per_s']:10.0f} events/s  {result['jobs_per_s']:9.0f} jobs/s  {rss}")
+
+    output = args.output or f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, "w") as f:
+        json.dump({
+            "created": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} scenario(s) regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,67 @@
 import argparse
 import logging
 from datetime import datetime
-from aischedlab.core.simengine import SimulationEngine
-from aischedlab.core.yaml_loader import load_jobs, load_cluster
-from aischedlab.core.strategies import BackfillScheduler, SJFJobScheduler, FIFOScheduler
+from aischedlab.core.metric_sink import METRIC_FORMATS
+from aischedlab.core.simengine import ENGINES, SimulationEngine
+from aischedlab.core.yaml_loader import iter_jobs, load_cluster
+from aischedlab.core.strategies import SCHEDULERS
+from aischedlab.core.tracing import TraceLevel, Tracer
 
-log_filename = f"ai_sched_lab_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    handlers=[
-        logging.FileHandler(log_filename, mode='w'),
-        logging.StreamHandler()
-    ]
-)
 
 def main():
     parser = argparse.ArgumentParser(description="Run a simulation with a specified cluster and jobs.")
     parser.add_argument('--cluster', type=str, required=True, help='Path to the cluster YAML file.')
-    parser.add_argument('--jobs', type=str, required=True, help='Path to the jobs YAML file.')
-    parser.add_argument('--scheduler', type=str, choices=['fifo', 'sjf', 'backfill'], default='fifo',
+    parser.add_argument('--jobs', type=str, required=True, help='Path to the job trace: YAML, or CSV/JSONL/SWF sorted by submit time (optionally .gz).')
+    parser.add_argument('--scheduler', type=str, choices=list(SCHEDULERS), default='fifo',
                         help='Scheduling strategy to use (default: fifo).')
+    parser.add_argument('--compact', action='store_true',
+                        help='Store the cluster as NumPy arrays (ArrayCluster), recommended for very large clusters.')
+    parser.add_argument('--engine', type=str, choices=ENGINES, default='simpy',
+                        help='Simulation engine: simpy or the heap-based fast engine (default: simpy).')
+    parser.add_argument('--instrument', action='store_true',
+                        help='Record scheduling pass latencies, nodes scanned and queue lengths; exported with the metrics.')
+    parser.add_argument('--output-dir', type=str, default='metrics', help='Directory for the metric files (default: metrics).')
+    parser.add_argument('--metric-format', type=str, choices=METRIC_FORMATS, default='csv',
+                        help='Metric file format: csv, or npz for chunked NumPy columns (default: csv).')
+    parser.add_argument('--stream-metrics', action='store_true',
+                        help='Write job rows and utilization samples during the run so memory stays bounded on long traces.')
+    parser.add_argument('--log-level', type=str, choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='WARNING',
+                        help='Logging level (default: WARNING). Per-job events go to --trace instead of the log.')
+    parser.add_argument('--trace', type=str, default=None,
+                        help='Write a structured event trace: binary, or newline-delimited JSON for .ndjson/.jsonl paths. '
+                             'Convert binary traces with aischedlab-trace.')
+    parser.add_argument('--trace-level', type=str, choices=['jobs', 'decisions'], default='jobs',
+                        help='Trace job submit/start/finish only, or also scheduler waits, reservations and backfills (default: jobs).')
     
     args = parser.parse_args()
+
+    log_filename = f"ai_sched_lab_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+    logging.basicConfig(
+        level=args.log_level,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        handlers=[
+            logging.FileHandler(log_filename, mode='w'),
+            logging.StreamHandler()
+        ]
+    )
     
-    # Load cluster and jobs from YAML files
-    cluster = load_cluster(args.cluster)
-    jobs = load_jobs(args.jobs)
+    # Load the cluster; jobs are streamed from the trace during the simulation
+    cluster = load_cluster(args.cluster, compact=args.compact)
+    jobs = iter_jobs(args.jobs)
     
-    if args.scheduler == 'fifo':
-        scheduler_cls = FIFOScheduler
-    elif args.scheduler == 'sjf':
-        scheduler_cls = SJFJobScheduler
-    elif args.scheduler == 'backfill':
-        scheduler_cls = BackfillScheduler
+    scheduler_cls = SCHEDULERS[args.scheduler]
+
+    tracer = Tracer(args.trace, level=TraceLevel[args.trace_level.upper()]) if args.trace else None
 
     # Create and run the simulation engine
-    sim_engine = SimulationEngine(cluster=cluster, jobs=jobs, scheduler_cls=scheduler_cls)
-    sim_engine.run()
+    sim_engine = SimulationEngine(cluster=cluster, jobs=jobs, scheduler_cls=scheduler_cls, engine=args.engine,
+                                  instrument=args.instrument, tracer=tracer, output_dir=args.output_dir,
+                                  metric_format=args.metric_format, stream_metrics=args.stream_metrics)
+    try:
+        sim_engine.run()
+    finally:
+        if tracer is not None:
+            tracer.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
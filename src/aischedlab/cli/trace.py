@@ -0,0 +1,28 @@
+import argparse
+import json
+import sys
+
+from aischedlab.core.tracing import format_record, read_trace
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a simulation event trace to readable text or NDJSON.")
+    parser.add_argument('trace', type=str, help='Trace file written with aischedlab --trace.')
+    parser.add_argument('--format', type=str, choices=['text', 'ndjson'], default='text',
+                        help='Output format (default: text).')
+    parser.add_argument('--output', type=str, default=None, help='Output file (default: stdout).')
+    args = parser.parse_args()
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for record in read_trace(args.trace):
+            if args.format == "ndjson":
+                out.write(json.dumps({"time": record.time, "event": record.event.name.lower(),
+                                      "job": record.job, "node": record.node}) + "\n")
+            else:
+                out.write(format_record(record) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,134 @@
 from abc import ABC, abstractmethod
 import simpy
-from aischedlab.core.models import Job, Cluster
+import logging
+from typing import Callable, Optional
+from aischedlab.core.models import Job, Node, Cluster
 from aischedlab.core.metric_collector import MetricCollector
+from aischedlab.core.tracing import TraceEvent
+
+logger = logging.getLogger(__name__)
 
 class BaseScheduler(ABC):
+    # Bump in a strategy whenever its decisions change, so cached results of older versions are not reused
+    version = "1"
+    # Structured event trace, set by the engine when the run is traced
+    tracer = None
+    # The SimulationEngine running the strategy, set by the engine
+    engine = None
+
     def __init__(self, cluster: Cluster):
         """
         Initialize the base scheduler with a cluster.
-        
+
         :param cluster: The cluster where jobs will be scheduled.
         """
         self.cluster = cluster
         self.jobs = []
-    
+        # Whether the next pass must recheck every pending job, see capacity_released()
+        self.rescan = True
+
+    def submit(self, job: Job):
+        """
+        Add a newly submitted job to the pending queue.
+
+        :param job: The job that was submitted.
+        """
+        self.jobs.append(job)
+
+    def pending_jobs(self) -> list[Job]:
+        """
+        Return the jobs that were submitted but not started yet.
+        """
+        return list(self.jobs)
+
+    def queue_length(self) -> int:
+        """
+        Return the number of pending jobs without copying the queue.
+        """
+        return len(self.jobs)
+
     @abstractmethod
-    def schedule(self, env: simpy.Environment, job: Job, metrics: MetricCollector):
+    def schedule(self, env: simpy.Environment, metrics: MetricCollector) -> list[tuple[Job, Node]]:
         """
-        Schedule a job in the simulation environment.
-        
+        Run one scheduling pass over the pending jobs.
+
+        The simulation engine calls this whenever a job is submitted or completes.
+        Implementations start jobs with :meth:`start_job` and return the
+        ``(job, node)`` placements made during the pass.
+
         :param env: The simulation environment.
-        :param job: The job to be scheduled.
+        :param metrics: The metric collector of the running simulation.
+        :return: The jobs started in this pass together with their nodes.
+        """
+        pass
+
+    def restore_running(self, env: simpy.Environment, job: Job, node: Node, end_time: float):
+        """
+        Take over a job that is already running on a node, when resuming from a snapshot.
+
+        The cluster already holds the job's allocation; strategies that track running jobs register it here.
         """
         pass
+
+    def capacity_released(self):
+        """
+        Note that free capacity may have grown since the last pass, e.g. because a job finished or a node
+        powered on. Until this is called, free capacity has only shrunk since the last pass, so the jobs that
+        waited then still cannot start and a pass only needs to try the jobs submitted since.
+        """
+        self.rescan = True
+
+    def find_fit(self, job: Job, failed_shapes: list, find: Optional[Callable[[Job], object]] = None):
+        """
+        Look up a node for a job during a pass, skipping the lookup for requests that cannot fit.
+
+        Free capacity only shrinks during a pass, so a job that needs at least as much of every resource as a
+        request that already failed in the pass fails too. Failed requests are added to ``failed_shapes``,
+        which the caller starts empty on every pass.
+
+        :param job: The job to place.
+        :param failed_shapes: (gpus, cpus, memory) of the smallest requests that failed in the pass.
+        :param find: The lookup, returning a placement or None. Defaults to ``cluster.find_node``.
+        :return: The result of the lookup, or None without a lookup for a request no smaller than a failed one.
+        """
+        gpus, cpus, memory = job.gpus, job.cpus, job.memory
+        for failed in failed_shapes:
+            if gpus >= failed[0] and cpus >= failed[1] and memory >= failed[2]:
+                return None
+        placement = (find or self.cluster.find_node)(job)
+        if placement is None:
+            # Keep only the smallest failed requests, larger ones are implied by them
+            failed_shapes[:] = [failed for failed in failed_shapes
+                                if not (failed[0] >= gpus and failed[1] >= cpus and failed[2] >= memory)]
+            failed_shapes.append((gpus, cpus, memory))
+        return placement
+
+    def request_wakeup(self, delay: float):
+        """
+        Ask the engine for an extra scheduling pass ``delay`` from now, e.g. once a node has powered on.
+        """
+        self.engine.schedule_wakeup(delay)
+
+    def start_job(self, env: simpy.Environment, job: Job, node: Node, metrics: MetricCollector):
+        """
+        Allocate the resources of a job on a node and record its start.
+        """
+        job.waiting_time = env.now - job.submit_time
+        metrics.record_job_start(job, env)
+        metrics.record_utilization(env, self.cluster)
+
+        self.cluster.allocate(node, job, env.now)
+        if self.tracer is not None:
+            self.tracer.emit(TraceEvent.START, env.now, job, node)
+
+    def finish_job(self, env: simpy.Environment, job: Job, node: Node, metrics: MetricCollector):
+        """
+        Release the resources of a completed job and record its end.
+        """
+        self.cluster.release(node, job, env.now)
+        self.capacity_released()
+        if self.tracer is not None:
+            self.tracer.emit(TraceEvent.FINISH, env.now, job, node)
+
+        metrics.record_job_end(job, env, node)
+        metrics.record_utilization(env, self.cluster)
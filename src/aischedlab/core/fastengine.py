@@ -0,0 +1,69 @@
+import heapq
+import itertools
+from enum import IntEnum
+from typing import Iterator, NamedTuple, Optional
+
+from aischedlab.core.models import Job, Node
+
+class EventType(IntEnum):
+    SUBMIT = 0
+    FINISH = 1
+    DISPATCH = 2
+    TIMER = 3  # Wake-up requested by the strategy, see SimulationEngine.schedule_wakeup()
+
+class Event(NamedTuple):
+    time: float
+    seq: int  # Insertion counter, breaks ties between events at the same time in FIFO order
+    type: EventType
+    job: Optional[Job] = None
+    node: Optional[Node] = None
+
+class FastEnvironment:
+    """
+    Minimal heapq-based discrete-event core used by ``SimulationEngine(engine="fast")``.
+
+    It exposes ``now`` like ``simpy.Environment`` so schedulers and the metric collector work with
+    either engine. Events at the same time are processed in the order they were scheduled, which
+    matches simpy's ordering for the events the simulation engine creates.
+    """
+
+    def __init__(self, initial_time: float = 0):
+        self.now = initial_time
+        self.events_processed = 0
+        self._queue = []
+        self._seq = itertools.count()
+        self._dispatch_pending = False
+
+    def schedule(self, delay: float, event_type: EventType, job: Job = None, node: Node = None):
+        """
+        Schedule an event ``delay`` time units from now.
+        """
+        heapq.heappush(self._queue, Event(self.now + delay, next(self._seq), event_type, job, node))
+
+    def request_dispatch(self, delay: float = 0):
+        """
+        Schedule a scheduling pass at the current time, or ``delay`` from now, unless one is already pending.
+        """
+        if not self._dispatch_pending:
+            self._dispatch_pending = True
+            self.schedule(delay, EventType.DISPATCH)
+
+    def empty(self) -> bool:
+        return not self._queue
+
+    def events(self, until: Optional[float] = None) -> Iterator[Event]:
+        """
+        Pop events in time order until the queue is empty, advancing ``now`` to each event.
+
+        :param until: Stop before the first event at or after this time, leaving it queued.
+        """
+        queue = self._queue
+        if until is None:
+            until = float("inf")
+        while queue and queue[0].time < until:
+            event = heapq.heappop(queue)
+            self.now = event.time
+            self.events_processed += 1
+            if event.type is EventType.DISPATCH:
+                self._dispatch_pending = False
+            yield event
@@ -0,0 +1,132 @@
+import time
+
+class Histogram:
+    """
+    Fixed-size histogram with power-of-two buckets: bucket ``i`` counts values below ``2 ** i``
+    that did not fit into bucket ``i - 1``. Recording is O(1) and memory does not grow with the run.
+    """
+
+    def __init__(self, buckets: int = 64):
+        self.counts = [0] * buckets
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int):
+        index = int(value).bit_length()
+        if index >= len(self.counts):
+            index = len(self.counts) - 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> int:
+        """
+        Upper bound of the bucket holding the q-quantile, i.e. accurate to a factor of two.
+        """
+        if self.count == 0:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min((1 << index) - 1, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        last = max((i for i, count in enumerate(self.counts) if count), default=-1)
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+            "buckets": self.counts[:last + 1],
+        }
+
+class SampledSeries:
+    """
+    Bounded (time, value) series: when full, every other sample is dropped and the sampling stride doubles.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.samples = []
+        self.stride = 1
+        self._skipped = 0
+
+    def record(self, time: float, value):
+        self._skipped += 1
+        if self._skipped < self.stride:
+            return
+        self._skipped = 0
+        self.samples.append((time, value))
+        if len(self.samples) >= self.capacity:
+            self.samples = self.samples[::2]
+            self.stride *= 2
+
+class Instrumentation:
+    """
+    Opt-in hot-path counters for a simulation run.
+
+    Enabled with ``SimulationEngine(instrument=True)``. When disabled the engine and cluster only
+    pay for one ``is None`` check per scheduling pass and per node lookup.
+    """
+
+    def __init__(self, series_capacity: int = 1024):
+        self.pass_latency_ns = Histogram()
+        self.nodes_scanned = Histogram()
+        self.queue_length = Histogram()
+        self.queue_series = SampledSeries(series_capacity)
+        self.placements = 0
+        self.total_nodes_scanned = 0
+        self.events = 0
+        self.wall_time_s = 0.0
+        self._wall_start = None
+        self._queue_area = 0.0
+        self._last_sample = None  # (simulation time, queue length)
+        self._first_time = None
+
+    def start(self):
+        self._wall_start = time.perf_counter()
+
+    def stop(self, events: int):
+        self.wall_time_s = time.perf_counter() - self._wall_start
+        self.events = events
+
+    def record_pass(self, now: float, latency_ns: int, queue_length: int):
+        self.pass_latency_ns.record(latency_ns)
+        self.queue_length.record(queue_length)
+        self.queue_series.record(now, queue_length)
+        # Time-weighted queue length: the previous length held until now
+        if self._last_sample is not None:
+            last_time, last_length = self._last_sample
+            self._queue_area += last_length * (now - last_time)
+        else:
+            self._first_time = now
+        self._last_sample = (now, queue_length)
+
+    def record_placement(self, scanned: int):
+        self.placements += 1
+        self.total_nodes_scanned += scanned
+        self.nodes_scanned.record(scanned)
+
+    def to_dict(self) -> dict:
+        span = self._last_sample[0] - self._first_time if self._last_sample is not None else 0
+        return {
+            "scheduling_passes": self.pass_latency_ns.count,
+            "pass_latency_ns": self.pass_latency_ns.to_dict(),
+            "placements": self.placements,
+            "total_nodes_scanned": self.total_nodes_scanned,
+            "nodes_scanned_per_placement": self.nodes_scanned.to_dict(),
+            "queue_length": self.queue_length.to_dict(),
+            "time_weighted_queue_length": self._queue_area / span if span > 0 else 0,
+            "queue_length_series": self.queue_series.samples,
+            "events": self.events,
+            "wall_time_s": self.wall_time_s,
+            "events_per_wall_second": self.events / self.wall_time_s if self.wall_time_s > 0 else 0,
+        }
@@ -1,150 +1,239 @@
 import logging
-import csv
+import json
 import os
 
 import simpy
+from typing import Optional
 
+from aischedlab.core.metric_sink import MetricSink, create_sink
 from aischedlab.core.models import Job, Node, Cluster
+from aischedlab.core.sketch import QuantileSketch
 
 logger = logging.getLogger(__name__)
 
+JOB_FIELDS = ["submit_time", "start_time", "end_time", "waiting_time_seconds", "energy_kWh"]
+# Per-job distributions kept as quantile sketches
+DISTRIBUTIONS = ("waiting_time", "bounded_slowdown", "turnaround")
+# Runtime below which bounded slowdown treats a job as this long, so very short jobs do not dominate it
+SLOWDOWN_TAU = 10.0
+
 class MetricCollector:
-    def __init__(self):
-        self.waiting_times = []
-        self.job_events = []
-        self.energy_usage = []
-        self.utilization_samples = []
+    def __init__(self, expected_jobs: int = 0, sink: Optional[MetricSink] = None):
+        """
+        Collect job, node and cluster metrics during a simulation.
+
+        :param expected_jobs: Number of jobs in the trace, if known, used to preallocate the job columns.
+        :param sink: Stream metrics to this sink while the simulation runs: a job's row is written and
+                     its slot reused as soon as the job completes, and every utilization sample is
+                     written as it is taken. Without a sink all job rows are kept until :meth:`report`.
+        """
+        # Columnar job store: one list per field, indexed by the row assigned to a job name
+        self._job_index = {}
+        self._job_names = [None] * expected_jobs
+        self._job_columns = {field: [None] * expected_jobs for field in JOB_FIELDS}
+        self._rows_used = 0
+        self._free_rows = []  # Rows of streamed jobs, reused by later jobs
+        self.sink = sink
+        self.node_energy = {}
+        # Running statistics, so the cluster aggregates do not grow with the run
+        self.jobs_started = 0
+        self.waiting_time_total = 0.0
+        self.job_energy_total = 0.0
+        self.utilization_count = 0
+        self.utilization_total = 0.0
+        self.utilization_peak = None
+        self.utilization_min = None
+        self.distributions = {name: QuantileSketch() for name in DISTRIBUTIONS}
+        self.fragmentation = {"avg_stranded_gpus": 0, "peak_stranded_gpus": 0, "avg_stranded_gpu_percent": 0}
+        self.instrumentation = None  # Set by the engine when the run is instrumented
+
+    def _job_row(self, name: str) -> int:
+        row = self._job_index.get(name)
+        if row is None:
+            if self._free_rows:
+                row = self._free_rows.pop()
+            else:
+                row = self._rows_used
+                self._rows_used += 1
+                if row == len(self._job_names):
+                    # Grow all columns geometrically so appends stay amortized O(1)
+                    growth = [None] * max(row, 64)
+                    self._job_names.extend(growth)
+                    for column in self._job_columns.values():
+                        column.extend(growth)
+            self._job_index[name] = row
+            self._job_names[row] = name
+        return row
+
+    def _job_metrics_row(self, row: int) -> dict:
+        columns = self._job_columns
+        metrics = {"job_name": self._job_names[row]}
+        for field in JOB_FIELDS:
+            value = columns[field][row]
+            metrics[field] = '' if value is None else value
+        return metrics
+
+    def _job_tuple(self, row: int) -> tuple:
+        columns = self._job_columns
+        return (self._job_names[row], columns["waiting_time_seconds"][row], columns["submit_time"][row],
+                columns["start_time"][row], columns["end_time"][row], columns["energy_kWh"][row])
+
+    def get_job(self, name: str) -> dict:
+        """
+        Return the recorded metrics of a single job. With a sink, only jobs that have not completed are kept.
+        """
+        return self._job_metrics_row(self._job_index[name])
 
     def get_job_metrics(self):
-        jobs = set(wait['job'] for wait in self.waiting_times)
-        jobs.update(event['job'] for event in self.job_events)
-        metrics = []
-        for job in jobs:
-            metrics.append({
-                "job_name": job,
-                "waiting_time_seconds": next((w['waiting_time'] for w in self.waiting_times if w['job'] == job), ''),
-                "submit_time": next((e['time'] for e in self.job_events if e['job'] == job and e['event'] == 'submitted'), ''),
-                "start_time": next((e['time'] for e in self.job_events if e['job'] == job and e['event'] == 'started'), ''),
-                "end_time": next((e['time'] for e in self.job_events if e['job'] == job and e['event'] == 'ended'), ''),
-            })
-        return metrics
+        """
+        Return the job rows held in memory: every job without a sink, otherwise the jobs that have not completed.
+        """
+        return [self._job_metrics_row(row) for row in self._job_index.values()]
 
     def get_node_metrics(self):
-        nodes = set(usage['node'] for usage in self.energy_usage)
         node_metrics = []
         # Extend utilization and idle time logic as needed
-        for node in nodes:
-            energy = sum(usage['energy'] for usage in self.energy_usage if usage['node'] == node)
+        for node, usage in self.node_energy.items():
             avg_util = 0  # Extend your utilization tracking for per-node stats
             avg_idle = 0  # Extend your tracking for per-node idle time
             node_metrics.append({
                 "node_name": node,
-                "energy_consumed_kWh": energy,
+                "energy_consumed_kWh": usage['energy'],
+                "idle_energy_kWh": usage['idle_energy'],
+                "active_energy_kWh": usage['active_energy'],
                 "avg_utilization_percent": avg_util,
-                "avg_idle_time_seconds": avg_idle
+                "avg_idle_time_seconds": avg_idle,
+                "sleep_energy_kWh": usage['sleep_energy'],
+                "transition_energy_kWh": usage['transition_energy'],
             })
         return node_metrics
 
     def get_cluster_metrics(self):
-        avg_util = sum(u['utilization_percent'] for u in self.utilization_samples) / len(self.utilization_samples) if self.utilization_samples else 0
-        peak_util = max((u['utilization_percent'] for u in self.utilization_samples), default=0)
-        min_util = min((u['utilization_percent'] for u in self.utilization_samples), default=0)
+        avg_util = self.utilization_total / self.utilization_count if self.utilization_count else 0
         return {
             "avg_cluster_utilization_percent": avg_util,
-            "peak_cluster_utilization_percent": peak_util,
-            "min_cluster_utilization_percent": min_util
+            "peak_cluster_utilization_percent": self.utilization_peak if self.utilization_count else 0,
+            "min_cluster_utilization_percent": self.utilization_min if self.utilization_count else 0,
+            **self.fragmentation,
         }
 
+    def get_distribution_metrics(self) -> dict:
+        """
+        Percentiles of waiting time, bounded slowdown and turnaround, e.g. ``waiting_time_p99``.
+        """
+        metrics = {}
+        for name, sketch in self.distributions.items():
+            for quantile, value in sketch.quantiles().items():
+                metrics[f"{name}_{quantile}"] = value
+        return metrics
+
+    def average_waiting_time(self) -> float:
+        return self.waiting_time_total / self.jobs_started if self.jobs_started else 0.0
+
     def record_job_start(self, job: Job, env: simpy.Environment):
         job.waiting_time = env.now - job.submit_time
-        self.waiting_times.append({'job': job.name, 'waiting_time': job.waiting_time})
-        self.job_events.append({'job': job.name, 'event': 'started', 'time': env.now})
-
-    def record_job_end(self, job: Job, env: simpy.Environment):
-        self.job_events.append({'job': job.name, 'event': 'ended', 'time': env.now})
+        row = self._job_row(job.name)
+        self._job_columns["waiting_time_seconds"][row] = job.waiting_time
+        self._job_columns["start_time"][row] = env.now
+        self.jobs_started += 1
+        self.waiting_time_total += job.waiting_time
+        self.distributions["waiting_time"].add(job.waiting_time)
+
+    def record_job_end(self, job: Job, env: simpy.Environment, node: Optional[Node] = None):
+        """
+        :param node: The node the job ran on, to attribute energy to the job.
+        """
+        row = self._job_row(job.name)
+        columns = self._job_columns
+        columns["end_time"][row] = env.now
+        turnaround = env.now - columns["submit_time"][row]
+        runtime = env.now - columns["start_time"][row]
+        if node is not None:
+            energy = job_energy(job, node, runtime)
+            columns["energy_kWh"][row] = energy
+            self.job_energy_total += energy
+        self.distributions["turnaround"].add(turnaround)
+        self.distributions["bounded_slowdown"].add(max(1.0, turnaround / max(runtime, SLOWDOWN_TAU)))
+        if self.sink is not None:
+            # The row is final: stream it out and free the slot
+            self.sink.write("jobs", self._job_tuple(row))
+            del self._job_index[job.name]
+            self._job_names[row] = None
+            for column in self._job_columns.values():
+                column[row] = None
+            self._free_rows.append(row)
 
     def record_job_submission(self, job: Job, env: simpy.Environment):
-        self.job_events.append({'job': job.name, 'event': 'submitted', 'time': env.now})
+        self._job_columns["submit_time"][self._job_row(job.name)] = env.now
 
     def record_energy(self, node: Node):
-        self.energy_usage.append({'node': node.name, 'energy': node.energy_consumption})
+        # Energy counters on the node are cumulative, so the latest record wins
+        self.node_energy[node.name] = {
+            'energy': node.energy_consumption,
+            'idle_energy': node.energy_idle,
+            'active_energy': node.energy_active,
+            'sleep_energy': node.energy_sleep,
+            'transition_energy': node.energy_transition,
+        }
 
-    def record_utilization(self, env: simpy.Environment, cluster: Cluster):
-        total_gpus = sum(node.gpus_total for node in cluster.nodes)
-        total_cpus = sum(node.cpus_total for node in cluster.nodes)
-        total_mem = sum(node.memory_total for node in cluster.nodes)
-        used_gpus = sum(node.gpus_total - node.gpus_available for node in cluster.nodes)
-        used_cpus = sum(node.cpus_total - node.cpus_available for node in cluster.nodes)
-        used_mem = sum(node.memory_total - node.memory_available for node in cluster.nodes)
-        total_resources = total_gpus + total_cpus + total_mem
-        used_resources = used_gpus + used_cpus + used_mem
-        utilization = (used_resources / total_resources) * 100 if total_resources > 0 else 0
-        self.utilization_samples.append({'time': env.now, 'utilization_percent': utilization})
-
-    def report(self, output_file: str ="metrics_scheduler"):
-        os.makedirs("metrics", exist_ok=True)
-
-        # --- Job metrics ---
-        job_fieldnames = ["job_name", "waiting_time_seconds", "submit_time", "start_time", "end_time"]
-        jobs = set(wait['job'] for wait in self.waiting_times)
-        jobs.update(event['job'] for event in self.job_events)
-        job_metrics_file = f"{output_file}_jobs.csv"
-        with open(os.path.join("metrics", job_metrics_file), "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=job_fieldnames)
-            writer.writeheader()
-            for job in jobs:                
-                row = {
-                    "job_name": job,
-                    "waiting_time_seconds": next((w['waiting_time'] for w in self.waiting_times if w['job'] == job), ''),
-                    "submit_time": next((e['time'] for e in self.job_events if e['job'] == job and e['event'] == 'submitted'), ''),
-                    "start_time": next((e['time'] for e in self.job_events if e['job'] == job and e['event'] == 'started'), ''),
-                    "end_time": next((e['time'] for e in self.job_events if e['job'] == job and e['event'] == 'ended'), ''),
-                }
-                writer.writerow(row)
-
-        # --- Node metrics ---
-        node_fieldnames = ["node_name", "energy_consumed_kWh", "avg_utilization_percent", "avg_idle_time_seconds"]
-        nodes = set(usage['node'] for usage in self.energy_usage)
-        node_metrics_file = f"{output_file}_nodes.csv"
-
-        # Collect utilization samples per node
-        node_util_samples = {}
-        node_idle_times = {}
-        for sample in self.utilization_samples:
-            # You may need to adapt this if you want per-node utilization
-            # Here we assume cluster-wide, but you can extend your record_utilization to record per-node
-            pass
-
-        # Calculate average utilization and idle time per node
-        # For demonstration, we'll set them to 0 unless you extend your utilization tracking
-        with open(os.path.join("metrics", node_metrics_file), "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=node_fieldnames)
-            writer.writeheader()
-            for node in nodes:
-                energy = sum(usage['energy'] for usage in self.energy_usage if usage['node'] == node)
-                avg_util = 0  # Extend your utilization tracking for per-node stats
-                avg_idle = 0  # Extend your tracking for per-node idle time
-                row = {
-                    "node_name": node,
-                    "energy_consumed_kWh": energy,
-                    "avg_utilization_percent": avg_util,
-                    "avg_idle_time_seconds": avg_idle
-                }
-                writer.writerow(row)
-
-        # --- Cluster metrics ---
-        cluster_fieldnames = ["avg_cluster_utilization_percent", "peak_cluster_utilization_percent", "min_cluster_utilization_percent"]
-        cluster_metrics_file = f"{output_file}_cluster.csv"
-        avg_util = sum(u['utilization_percent'] for u in self.utilization_samples) / len(self.utilization_samples) if self.utilization_samples else 0
-        peak_util = max((u['utilization_percent'] for u in self.utilization_samples), default=0)
-        min_util = min((u['utilization_percent'] for u in self.utilization_samples), default=0)
-        with open(os.path.join("metrics", cluster_metrics_file), "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=cluster_fieldnames)
-            writer.writeheader()
-            writer.writerow({
-                "avg_cluster_utilization_percent": avg_util,
-                "peak_cluster_utilization_percent": peak_util,
-                "min_cluster_utilization_percent": min_util
-            })
+    def record_fragmentation(self, cluster: Cluster, now: float):
+        """
+        Record the time-weighted stranded GPUs of a cluster whose counters were accrued up to ``now``.
+        """
+        avg_stranded = cluster.stranded_gpu_seconds / now if now > 0 else 0
+        self.fragmentation = {
+            "avg_stranded_gpus": avg_stranded,
+            "peak_stranded_gpus": cluster.gpus_stranded_peak,
+            "avg_stranded_gpu_percent": avg_stranded / cluster.gpus_total * 100 if cluster.gpus_total > 0 else 0,
+        }
 
-        logger.info(f"Metrics exported to 'metrics/' as jobs, nodes, and cluster CSV files.")
\ No newline at end of file
+    def record_utilization(self, env: simpy.Environment, cluster: Cluster):
+        utilization = cluster.utilization()
+        if self.utilization_count == 0:
+            self.utilization_peak = self.utilization_min = utilization
+        else:
+            self.utilization_peak = max(self.utilization_peak, utilization)
+            self.utilization_min = min(self.utilization_min, utilization)
+        self.utilization_count += 1
+        self.utilization_total += utilization
+        if self.sink is not None:
+            self.sink.write("utilization", (env.now, utilization))
+
+    def report(self, output_file: str = "metrics_scheduler", output_dir: str = "metrics", metric_format: str = "csv"):
+        """
+        Write the job, node and cluster metrics.
+
+        With a sink, the remaining rows are written to it and the sink is closed; the file arguments are
+        taken from the sink. Otherwise the metrics are written to ``{output_dir}/{output_file}_jobs.csv`` etc.
+
+        :param output_file: Prefix of the metric files.
+        :param output_dir: Directory of the metric files, created if missing.
+        :param metric_format: One of ``METRIC_FORMATS``.
+        """
+        sink = self.sink or create_sink(output_dir, output_file, metric_format)
+        # Jobs that did not complete, or every job without streaming
+        sink.write_rows("jobs", (self._job_tuple(row) for row in self._job_index.values()))
+        sink.write_rows("nodes", (tuple(m.values()) for m in self.get_node_metrics()))
+        sink.write("cluster", tuple(self.get_cluster_metrics().values()))
+        sink.close()
+
+        with open(os.path.join(sink.output_dir, f"{sink.prefix}_distributions.json"), "w") as f:
+            # Sketch states are included so distributions of several runs can be merged later
+            json.dump({name: {"mean": sketch.mean(), **sketch.quantiles(), "sketch": sketch.to_dict()}
+                       for name, sketch in self.distributions.items()}, f, indent=2)
+
+        if self.instrumentation is not None:
+            with open(os.path.join(sink.output_dir, f"{sink.prefix}_instrumentation.json"), "w") as f:
+                json.dump(self.instrumentation.to_dict(), f, indent=2)
+
+        logger.info(f"Metrics exported to '{sink.output_dir}/' as jobs, nodes, and cluster {metric_format} files.")
+
+def job_energy(job: Job, node: Node, runtime: float) -> float:
+    """
+    Energy attributed to a job in kWh: the node's full-load power times the job's share of the node
+    (the larger of its GPU and CPU fractions) over the run time. Jobs that together fill a node are
+    charged its active power; idle, sleeping and stranded capacity is left to the cluster total.
+    """
+    gpu_share = job.gpus / node.gpus_total if node.gpus_total > 0 else 0
+    cpu_share = job.cpus / node.cpus_total if node.cpus_total > 0 else 0
+    return node.power_active * max(gpu_share, cpu_share) * runtime / 3_600_000  # Watt-seconds to kWh
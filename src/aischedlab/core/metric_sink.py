@@ -0,0 +1,139 @@
+import csv
+import glob
+import os
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+# Columns of every table a MetricCollector produces
+TABLE_FIELDS = {
+    "jobs": ["job_name", "waiting_time_seconds", "submit_time", "start_time", "end_time", "energy_kWh"],
+    "nodes": ["node_name", "energy_consumed_kWh", "idle_energy_kWh", "active_energy_kWh", "avg_utilization_percent", "avg_idle_time_seconds",
+              "sleep_energy_kWh", "transition_energy_kWh"],
+    "cluster": ["avg_cluster_utilization_percent", "peak_cluster_utilization_percent", "min_cluster_utilization_percent",
+                "avg_stranded_gpus", "peak_stranded_gpus", "avg_stranded_gpu_percent"],
+    "utilization": ["time", "utilization_percent"],
+}
+METRIC_FORMATS = ("csv", "npz")
+
+class MetricSink(ABC):
+    """
+    Buffered writer for metric tables. Rows are tuples in the column order of ``TABLE_FIELDS`` and are
+    flushed to disk every ``chunk_rows`` rows, so memory stays bounded however long the run is.
+    """
+
+    def __init__(self, output_dir: str, prefix: str, chunk_rows: int = 65536):
+        """
+        :param output_dir: Directory of the metric files, created if missing.
+        :param prefix: Common prefix of the metric files, e.g. ``metrics_scheduler_FIFOScheduler``.
+        :param chunk_rows: Rows buffered per table before they are written.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.chunk_rows = chunk_rows
+        self._buffers = {table: [] for table in TABLE_FIELDS}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, table: str, row: tuple):
+        buffer = self._buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.chunk_rows:
+            self._flush(table, buffer)
+            buffer.clear()
+
+    def write_rows(self, table: str, rows):
+        for row in rows:
+            self.write(table, row)
+
+    def close(self):
+        for table, buffer in self._buffers.items():
+            if buffer:
+                self._flush(table, buffer)
+                buffer.clear()
+
+    @abstractmethod
+    def path(self, table: str) -> str:
+        """
+        Return the file a table is written to.
+        """
+        pass
+
+    @abstractmethod
+    def _flush(self, table: str, rows: list[tuple]):
+        """
+        Append a chunk of buffered rows to a table's file.
+        """
+        pass
+
+class CSVMetricSink(MetricSink):
+    """
+    One CSV file per table, ``{prefix}_{table}.csv``, appended chunk by chunk. Missing values are empty cells.
+    """
+
+    def __init__(self, output_dir: str, prefix: str, chunk_rows: int = 65536):
+        super().__init__(output_dir, prefix, chunk_rows)
+        self._started = set()
+
+    def path(self, table: str) -> str:
+        return os.path.join(self.output_dir, f"{self.prefix}_{table}.csv")
+
+    def _flush(self, table: str, rows: list[tuple]):
+        mode = "a" if table in self._started else "w"
+        with open(self.path(table), mode, newline="") as f:
+            writer = csv.writer(f)
+            if table not in self._started:
+                writer.writerow(TABLE_FIELDS[table])
+                self._started.add(table)
+            writer.writerows(rows)
+
+class NumpyMetricSink(MetricSink):
+    """
+    Columnar NumPy output: each chunk of a table is one ``{prefix}_{table}_{n:05d}.npz`` file holding one
+    array per column. Missing numeric values are NaN. Read a table back with :func:`load_columns`.
+    """
+
+    def __init__(self, output_dir: str, prefix: str, chunk_rows: int = 65536):
+        super().__init__(output_dir, prefix, chunk_rows)
+        self._chunks = {table: 0 for table in TABLE_FIELDS}
+
+    def path(self, table: str) -> str:
+        return os.path.join(self.output_dir, f"{self.prefix}_{table}_*.npz")
+
+    def _flush(self, table: str, rows: list[tuple]):
+        columns = {}
+        for field, values in zip(TABLE_FIELDS[table], zip(*rows)):
+            if field.endswith("_name"):
+                columns[field] = np.array(values, dtype=str)
+            else:
+                columns[field] = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+        path = os.path.join(self.output_dir, f"{self.prefix}_{table}_{self._chunks[table]:05d}.npz")
+        np.savez(path, **columns)
+        self._chunks[table] += 1
+
+def create_sink(output_dir: str, prefix: str, metric_format: str = "csv", chunk_rows: int = 65536) -> MetricSink:
+    """
+    Create the metric sink of a format in ``METRIC_FORMATS``.
+    """
+    if metric_format == "csv":
+        return CSVMetricSink(output_dir, prefix, chunk_rows)
+    if metric_format == "npz":
+        return NumpyMetricSink(output_dir, prefix, chunk_rows)
+    raise ValueError(f"Unknown metric format '{metric_format}', expected one of {METRIC_FORMATS}")
+
+def load_columns(output_dir: str, prefix: str, table: str) -> dict[str, np.ndarray]:
+    """
+    Concatenate the chunks of a table written by :class:`NumpyMetricSink`.
+    """
+    paths = sorted(glob.glob(os.path.join(output_dir, f"{glob.escape(prefix)}_{table}_*.npz")))
+    parts = {field: [] for field in TABLE_FIELDS[table]}
+    for path in paths:
+        with np.load(path) as chunk:
+            for field in parts:
+                parts[field].append(chunk[field])
+    return {field: np.concatenate(arrays) if arrays else np.array([]) for field, arrays in parts.items()}
@@ -1,5 +1,9 @@
-from dataclasses import dataclass
-from typing import Optional
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
 
 @dataclass
 class Job:
@@ -11,6 +15,12 @@ class Job:
     memory: int = 0 # in GB
     waiting_time: int = 0
 
+class PowerState(IntEnum):
+    ON = 0  # Powered: idle or running jobs, depending on the allocation
+    SLEEP = 1  # Sleeping or off, drawing power_sleep; cannot take jobs
+    WAKING = 2  # Transition to ON, charged as wake_energy
+    SUSPENDING = 3  # Transition to SLEEP, charged as sleep_energy
+
 @dataclass
 class Node:
     name: str
@@ -25,13 +35,624 @@ class Node:
     power_idle: float = 100.0 # Watts in idle state
     power_active: float = 300.0 # Watts in active state
     energy_consumption: float = 0.0 # kWh
+    energy_idle: float = 0.0 # kWh consumed while idle
+    energy_active: float = 0.0 # kWh consumed while running jobs
+    energy_updated_at: float = 0.0 # Simulation time energy was last accrued
+
+    # Power states, see Cluster.suspend() and Cluster.wake(). Sleep doubles as "off" with power_sleep=0
+    power_state: int = PowerState.ON
+    power_sleep: float = 10.0 # Watts while asleep
+    sleep_latency: float = 0.0 # Seconds from the suspend request until the node is asleep
+    wake_latency: float = 0.0 # Seconds from the wake request until the node can take jobs
+    sleep_energy: float = 0.0 # kWh per suspend
+    wake_energy: float = 0.0 # kWh per wake-up
+    transition_end: float = 0.0 # Simulation time the current transition completes
+    energy_sleep: float = 0.0 # kWh consumed while asleep
+    energy_transition: float = 0.0 # kWh consumed by suspends and wake-ups
 
     def utilization(self) -> float:
         used_gpus = self.gpus_total - self.gpus_available
         return (used_gpus / self.gpus_total) * 100 if self.gpus_total > 0 else 0
 
+    def is_active(self) -> bool:
+        return (self.gpus_available < self.gpus_total or
+                self.cpus_available < self.cpus_total or
+                self.memory_available < self.memory_total)
+
+    def power_draw(self) -> float:
+        """
+        Current power draw in Watts, interpolated between idle and active power by the busy fraction.
+        Transitions draw nothing here, their energy is charged in one go when they start.
+        """
+        if self.power_state != PowerState.ON:
+            return self.power_sleep if self.power_state == PowerState.SLEEP else 0.0
+        if not self.is_active():
+            return self.power_idle
+        gpu_load = (self.gpus_total - self.gpus_available) / self.gpus_total if self.gpus_total > 0 else 0
+        cpu_load = (self.cpus_total - self.cpus_available) / self.cpus_total if self.cpus_total > 0 else 0
+        load = max(gpu_load, cpu_load)
+        return self.power_idle + (self.power_active - self.power_idle) * load
+
+    def accrue_energy(self, now: float):
+        """
+        Charge the energy drawn since the last state change.
+
+        Must be called before every change of the node's allocation so that the
+        elapsed interval is charged at the power of the state that just ended.
+        """
+        if self.power_state == PowerState.SUSPENDING and now >= self.transition_end:
+            # The node fell asleep at transition_end; the suspend itself was charged up front
+            self.power_state = PowerState.SLEEP
+            self.energy_updated_at = max(self.energy_updated_at, self.transition_end)
+        elapsed = now - self.energy_updated_at
+        if elapsed > 0:
+            energy = self.power_draw() * elapsed / 3_600_000  # Watt-seconds to kWh
+            if self.power_state == PowerState.SLEEP:
+                self.energy_sleep += energy
+            elif self.is_active():
+                self.energy_active += energy
+            else:
+                self.energy_idle += energy
+            self.energy_consumption += energy
+        self.energy_updated_at = now
+
 @dataclass
 class Cluster:
     nodes: list[Node]
+
+    # Running resource totals, maintained by allocate() and release()
+    gpus_total: int = field(init=False, repr=False, default=0)
+    cpus_total: int = field(init=False, repr=False, default=0)
+    memory_total: int = field(init=False, repr=False, default=0)
+    gpus_used: int = field(init=False, repr=False, default=0)
+    cpus_used: int = field(init=False, repr=False, default=0)
+    memory_used: int = field(init=False, repr=False, default=0)
+    # Stranded GPUs: free GPUs on nodes that already run a job, so they cannot host a whole-node job.
+    # Integrated over simulation time like node energy, on every allocate() and release()
+    gpus_stranded: int = field(init=False, repr=False, default=0)
+    gpus_stranded_peak: int = field(init=False, repr=False, default=0)
+    stranded_gpu_seconds: float = field(init=False, repr=False, default=0.0)
+    stranded_updated_at: float = field(init=False, repr=False, default=0.0)
+    # Optional Instrumentation that counts nodes scanned per placement
+    probe: object = field(init=False, repr=False, default=None)
+
+    def __post_init__(self):
+        self.refresh_counters()
+
+    def __getstate__(self):
+        # The capacity index refers to node positions in this process and is rebuilt on load
+        state = self.__dict__.copy()
+        for key in ("_positions", "_buckets", "_idle", "_levels"):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.refresh_counters()
+
+    def refresh_counters(self):
+        """
+        Recompute the resource totals and the capacity index from the nodes.
+
+        Only needed when nodes are added, removed or edited outside of allocate() and release().
+        """
+        # Capacity index of the powered nodes, by free GPU count ("level"), each bucket sorted by position.
+        # Busy nodes are bucketed by level alone; idle nodes, whose free resources are their totals, by
+        # level and (total CPUs, total memory), so each idle bucket holds interchangeable nodes.
+        self._positions = {id(node): position for position, node in enumerate(self.nodes)}
+        self._buckets = {}  # level -> positions of busy nodes
+        self._idle = {}  # level -> {(cpus_total, memory_total) -> positions of idle nodes}
+        for position, node in enumerate(self.nodes):
+            # Nodes that are not powered on cannot take jobs and stay out of the index
+            if node.power_state != PowerState.ON:
+                continue
+            if node.is_active():
+                self._buckets.setdefault(node.gpus_available, []).append(position)
+            else:
+                self._idle.setdefault(node.gpus_available, {}).setdefault((node.cpus_total, node.memory_total), []).append(position)
+        self._levels = sorted(set(self._buckets) | set(self._idle))
+
+        self.gpus_total = sum(node.gpus_total for node in self.nodes)
+        self.cpus_total = sum(node.cpus_total for node in self.nodes)
+        self.memory_total = sum(node.memory_total for node in self.nodes)
+        self.gpus_used = sum(node.gpus_total - node.gpus_available for node in self.nodes)
+        self.cpus_used = sum(node.cpus_total - node.cpus_available for node in self.nodes)
+        self.memory_used = sum(node.memory_total - node.memory_available for node in self.nodes)
+        self.gpus_stranded = sum(node.gpus_available for node in self.nodes if node.is_active())
+        self.gpus_stranded_peak = max(self.gpus_stranded_peak, self.gpus_stranded)
+
+    def allocate(self, node: Node, job: Job, now: float):
+        """
+        Reserve the resources of a job on a node.
+        """
+        node.accrue_energy(now)
+        stranded = self._begin_change(node, now)
+        self._unindex(node)
+        node.gpus_available -= job.gpus
+        node.cpus_available -= job.cpus
+        node.memory_available -= job.memory
+        self._index(node)
+        self._end_change(node, stranded)
+        self.gpus_used += job.gpus
+        self.cpus_used += job.cpus
+        self.memory_used += job.memory
+
+    def release(self, node: Node, job: Job, now: float):
+        """
+        Return the resources of a job to a node.
+        """
+        node.accrue_energy(now)
+        stranded = self._begin_change(node, now)
+        self._unindex(node)
+        node.gpus_available += job.gpus
+        node.cpus_available += job.cpus
+        node.memory_available += job.memory
+        self._index(node)
+        self._end_change(node, stranded)
+        self.gpus_used -= job.gpus
+        self.cpus_used -= job.cpus
+        self.memory_used -= job.memory
+
+    def suspend(self, node: Node, now: float):
+        """
+        Put an idle, powered node to sleep. It leaves the capacity index at once and is asleep
+        after ``node.sleep_latency``; ``node.sleep_energy`` is charged now.
+        """
+        if node.power_state != PowerState.ON or node.is_active():
+            raise ValueError(f"Only idle, powered nodes can be suspended, not node {node.name}")
+        node.accrue_energy(now)
+        self._unindex(node)
+        node.power_state = PowerState.SUSPENDING if node.sleep_latency > 0 else PowerState.SLEEP
+        node.transition_end = now + node.sleep_latency
+        self._charge_transition(node, node.sleep_energy)
+
+    def wake(self, node: Node, now: float) -> float:
+        """
+        Start powering on a sleeping or suspending node and charge ``node.wake_energy``.
+
+        A node that is still suspending finishes that first. Without wake latency the node is powered on
+        right away, otherwise complete the wake-up with :meth:`finish_wake` at the returned time.
+
+        :return: The simulation time the node can take jobs.
+        """
+        if node.power_state not in (PowerState.SLEEP, PowerState.SUSPENDING):
+            raise ValueError(f"Only sleeping nodes can be woken, not node {node.name}")
+        node.accrue_energy(now)
+        start = max(now, node.transition_end) if node.power_state == PowerState.SUSPENDING else now
+        node.power_state = PowerState.WAKING
+        node.transition_end = start + node.wake_latency
+        self._charge_transition(node, node.wake_energy)
+        if node.transition_end <= now:
+            self.finish_wake(node, now)
+        return node.transition_end
+
+    def finish_wake(self, node: Node, now: float):
+        """
+        Complete the wake-up of a node, returning it to the capacity index.
+        """
+        node.accrue_energy(now)
+        node.power_state = PowerState.ON
+        self._index(node)
+
+    def accrue_stranded(self, now: float):
+        """
+        Integrate the stranded GPU count up to the given simulation time.
+        """
+        self.stranded_gpu_seconds += self.gpus_stranded * (now - self.stranded_updated_at)
+        self.stranded_updated_at = now
+
+    def _begin_change(self, node: Node, now: float) -> int:
+        # Charge the stranded GPUs of the state that ends now and return the node's share of them
+        self.accrue_stranded(now)
+        return node.gpus_available if node.is_active() else 0
+
+    def _end_change(self, node: Node, stranded_before: int):
+        self.gpus_stranded += (node.gpus_available if node.is_active() else 0) - stranded_before
+        if self.gpus_stranded > self.gpus_stranded_peak:
+            self.gpus_stranded_peak = self.gpus_stranded
+
+    @staticmethod
+    def _charge_transition(node: Node, energy: float):
+        node.energy_transition += energy
+        node.energy_consumption += energy
+
+    def _index(self, node: Node):
+        level = node.gpus_available
+        if level not in self._buckets and level not in self._idle:
+            insort(self._levels, level)
+        if node.is_active():
+            bucket = self._buckets.setdefault(level, [])
+        else:
+            bucket = self._idle.setdefault(level, {}).setdefault((node.cpus_total, node.memory_total), [])
+        insort(bucket, self._positions[id(node)])
+
+    def _unindex(self, node: Node):
+        level = node.gpus_available
+        if node.is_active():
+            bucket = self._buckets[level]
+            del bucket[bisect_left(bucket, self._positions[id(node)])]
+            if not bucket:
+                del self._buckets[level]
+        else:
+            shapes = self._idle[level]
+            shape = (node.cpus_total, node.memory_total)
+            bucket = shapes[shape]
+            del bucket[bisect_left(bucket, self._positions[id(node)])]
+            if not bucket:
+                del shapes[shape]
+                if not shapes:
+                    del self._idle[level]
+        if level not in self._buckets and level not in self._idle:
+            del self._levels[bisect_left(self._levels, level)]
+
+    def find_node(self, job: Job, best_fit: bool = False, exclude: Optional[Node] = None) -> Optional[Node]:
+        """
+        Find a node with enough free resources for a job.
+
+        Only levels with at least ``job.gpus`` free GPUs are visited; CPUs and memory are checked
+        per busy node and once per group of identical idle nodes.
+
+        :param job: The job to place.
+        :param best_fit: Return a node with the fewest free GPUs that still fits instead of the first node in cluster order.
+        :param exclude: A node that must not be selected.
+        :return: The selected node, or None if no node fits.
+        """
+        nodes = self.nodes
+        best = None
+        scanned = 0
+        excluded = self._positions[id(exclude)] if exclude is not None else -1
+        for level in self._levels[bisect_left(self._levels, job.gpus):]:
+            for position in self._buckets.get(level, ()):
+                if best is not None and position >= best:
+                    break
+                if position == excluded:
+                    continue
+                node = nodes[position]
+                scanned += 1
+                if node.cpus_available >= job.cpus and node.memory_available >= job.memory:
+                    best = position
+                    break
+            for (cpus, memory), bucket in self._idle.get(level, {}).items():
+                scanned += 1
+                if cpus < job.cpus or memory < job.memory:
+                    continue
+                position = bucket[0] if bucket[0] != excluded else (bucket[1] if len(bucket) > 1 else None)
+                if position is not None and (best is None or position < best):
+                    best = position
+            if best_fit and best is not None:
+                break
+        if self.probe is not None:
+            self.probe.record_placement(scanned)
+        return nodes[best] if best is not None else None
+
+    def fitting_nodes(self, job: Job, distinct_idle: bool = False) -> Iterator[Node]:
+        """
+        Yield every node with enough free resources for a job, fewest free GPUs first and in
+        cluster order among nodes with the same number of free GPUs.
+
+        :param distinct_idle: Yield only the first idle node of each shape (total GPUs, CPUs and memory),
+                              for callers that score nodes by their free resources alone.
+        """
+        nodes = self.nodes
+        for level in self._levels[bisect_left(self._levels, job.gpus):]:
+            positions = [position for position in self._buckets.get(level, ())
+                         if nodes[position].cpus_available >= job.cpus and nodes[position].memory_available >= job.memory]
+            for (cpus, memory), bucket in self._idle.get(level, {}).items():
+                if cpus >= job.cpus and memory >= job.memory:
+                    positions.extend(bucket[:1] if distinct_idle else bucket)
+            for position in sorted(positions):
+                yield nodes[position]
+
+    def can_fit(self, job: Job) -> bool:
+        """
+        Whether any node currently has enough free resources for a job.
+        """
+        return self.find_node(job, best_fit=True) is not None
+
+    def accrue_energy(self, now: float):
+        """
+        Charge every node up to the given simulation time.
+        """
+        for node in self.nodes:
+            node.accrue_energy(now)
+
+    def utilization(self) -> float:
+        """
+        Share of all GPUs, CPUs and memory currently allocated, in percent.
+        """
+        total_resources = self.gpus_total + self.cpus_total + self.memory_total
+        used_resources = self.gpus_used + self.cpus_used + self.memory_used
+        return (used_resources / total_resources) * 100 if total_resources > 0 else 0
+
     def available_nodes(self) -> list[Node]:
-        return [node for node in self.nodes if node.gpus_available > 0 or node.cpus_avalable > 0 or node.memory_available > 0]
\ No newline at end of file
+        return [node for node in self.nodes if node.gpus_available > 0 or node.cpus_available > 0 or node.memory_available > 0]
+
+
+NODE_COLUMNS = {
+    "gpus_total": np.int64,
+    "cpus_total": np.int64,
+    "memory_total": np.int64,
+    "gpus_available": np.int64,
+    "cpus_available": np.int64,
+    "memory_available": np.int64,
+    "power_idle": np.float64,
+    "power_active": np.float64,
+    "energy_consumption": np.float64,
+    "energy_idle": np.float64,
+    "energy_active": np.float64,
+    "energy_updated_at": np.float64,
+    "power_state": np.int8,
+    "power_sleep": np.float64,
+    "sleep_latency": np.float64,
+    "wake_latency": np.float64,
+    "sleep_energy": np.float64,
+    "wake_energy": np.float64,
+    "transition_end": np.float64,
+    "energy_sleep": np.float64,
+    "energy_transition": np.float64,
+}
+
+def _column_property(column: str):
+    def getter(self):
+        return self._cluster.columns[column][self.index].item()
+    def setter(self, value):
+        self._cluster.columns[column][self.index] = value
+    return property(getter, setter)
+
+class NodeView:
+    """
+    Node-compatible view of one row of an ArrayCluster.
+
+    Views are created on demand and read and write straight through to the cluster's arrays.
+    """
+    __slots__ = ("_cluster", "index")
+
+    def __init__(self, cluster: "ArrayCluster", index: int):
+        self._cluster = cluster
+        self.index = index
+
+    @property
+    def name(self) -> str:
+        return self._cluster.names[self.index]
+
+    utilization = Node.utilization
+    is_active = Node.is_active
+    power_draw = Node.power_draw
+
+    def accrue_energy(self, now: float):
+        self._cluster._accrue_rows(self.index, now)
+
+    def __eq__(self, other):
+        return isinstance(other, NodeView) and other._cluster is self._cluster and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self._cluster), self.index))
+
+    def __repr__(self):
+        fields = ", ".join(f"{column}={getattr(self, column)!r}" for column in NODE_COLUMNS)
+        return f"NodeView(name={self.name!r}, {fields})"
+
+for _column in NODE_COLUMNS:
+    setattr(NodeView, _column, _column_property(_column))
+
+class _NodeViews:
+    """
+    Read-only sequence of NodeView objects over an ArrayCluster.
+    """
+    __slots__ = ("_cluster",)
+
+    def __init__(self, cluster: "ArrayCluster"):
+        self._cluster = cluster
+
+    def __len__(self):
+        return len(self._cluster.names)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [NodeView(self._cluster, i) for i in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("node index out of range")
+        return NodeView(self._cluster, index)
+
+    def __iter__(self):
+        cluster = self._cluster
+        return (NodeView(cluster, i) for i in range(len(cluster.names)))
+
+class ArrayCluster(Cluster):
+    """
+    Cluster stored as parallel NumPy arrays (one array per Node field) instead of Node objects.
+
+    ``nodes`` yields NodeView objects so strategies written against Node keep working, while fit
+    checks, utilization and energy accounting run as vectorized operations over all nodes.
+    """
+
+    def __init__(self, names: list[str], **columns):
+        """
+        :param names: Node names, one per row.
+        :param columns: Arrays or scalars for the fields in NODE_COLUMNS. ``*_available`` default to
+                        the matching ``*_total`` and the power and energy fields to the Node defaults.
+        """
+        self.names = list(names)
+        self.probe = None
+        self.gpus_stranded_peak = 0
+        self.stranded_gpu_seconds = 0.0
+        self.stranded_updated_at = 0.0
+        size = len(self.names)
+        defaults = {column: getattr(Node, column) for column in NODE_COLUMNS if hasattr(Node, column)}
+        for resource in ("gpus", "cpus", "memory"):
+            defaults[f"{resource}_available"] = columns[f"{resource}_total"]
+        self.columns = {}
+        for column, dtype in NODE_COLUMNS.items():
+            value = columns.get(column, defaults.get(column))
+            if value is None:
+                raise ValueError(f"Missing node column '{column}'")
+            array = np.array(value, dtype=dtype)
+            self.columns[column] = np.broadcast_to(array, (size,)).copy() if array.ndim == 0 else array
+            if len(self.columns[column]) != size:
+                raise ValueError(f"Column '{column}' has {len(self.columns[column])} rows, expected {size}")
+        self.refresh_counters()
+
+    def __repr__(self):
+        return f"ArrayCluster({len(self.names)} nodes)"
+
+    @classmethod
+    def from_nodes(cls, nodes: Iterable[Node]) -> "ArrayCluster":
+        nodes = list(nodes)
+        return cls([node.name for node in nodes],
+                   **{column: [getattr(node, column) for node in nodes] for column in NODE_COLUMNS})
+
+    @property
+    def nodes(self) -> _NodeViews:
+        return _NodeViews(self)
+
+    def to_nodes(self) -> list[Node]:
+        """
+        Materialize the rows as plain Node objects.
+        """
+        return [Node(name=name, **{column: self.columns[column][i].item() for column in NODE_COLUMNS})
+                for i, name in enumerate(self.names)]
+
+    def refresh_counters(self):
+        c = self.columns
+        self.gpus_total = int(c["gpus_total"].sum())
+        self.cpus_total = int(c["cpus_total"].sum())
+        self.memory_total = int(c["memory_total"].sum())
+        self.gpus_used = self.gpus_total - int(c["gpus_available"].sum())
+        self.cpus_used = self.cpus_total - int(c["cpus_available"].sum())
+        self.memory_used = self.memory_total - int(c["memory_available"].sum())
+        self.gpus_stranded = int(c["gpus_available"][self.active_mask()].sum())
+        self.gpus_stranded_peak = max(self.gpus_stranded_peak, self.gpus_stranded)
+
+    def fit_mask(self, job: Job) -> np.ndarray:
+        """
+        Boolean array marking every node with enough free resources for a job.
+        """
+        c = self.columns
+        return ((c["gpus_available"] >= job.gpus) &
+                (c["cpus_available"] >= job.cpus) &
+                (c["memory_available"] >= job.memory) &
+                (c["power_state"] == PowerState.ON))
+
+    def find_node(self, job: Job, best_fit: bool = False, exclude: Optional[NodeView] = None) -> Optional[NodeView]:
+        fits = self.fit_mask(job)
+        if exclude is not None:
+            fits[exclude.index] = False
+        if self.probe is not None:
+            # The mask checks every node at once
+            self.probe.record_placement(len(self.names))
+        if best_fit:
+            candidates = np.flatnonzero(fits)
+            if len(candidates) == 0:
+                return None
+            index = candidates[np.argmin(self.columns["gpus_available"][candidates])]
+        else:
+            index = int(np.argmax(fits))
+            if not fits[index]:
+                return None
+        return NodeView(self, int(index))
+
+    def fitting_nodes(self, job: Job, distinct_idle: bool = False) -> Iterator[NodeView]:
+        fits = self.fit_mask(job)
+        if distinct_idle:
+            c = self.columns
+            idle = fits & ~self.active_mask()
+            shapes = np.stack([c["gpus_total"][idle], c["cpus_total"][idle], c["memory_total"][idle]], axis=1)
+            # np.unique returns the first row of every shape
+            _, first = np.unique(shapes, axis=0, return_index=True)
+            fits &= ~idle
+            fits[np.flatnonzero(idle)[first]] = True
+        candidates = np.flatnonzero(fits)
+        order = np.argsort(self.columns["gpus_available"][candidates], kind="stable")
+        for index in candidates[order].tolist():
+            yield NodeView(self, index)
+
+    def can_fit(self, job: Job) -> bool:
+        return bool(self.fit_mask(job).any())
+
+    def allocate(self, node: NodeView, job: Job, now: float):
+        c = self.columns
+        i = node.index
+        self._accrue_rows(i, now)
+        stranded = self._begin_change(node, now)
+        c["gpus_available"][i] -= job.gpus
+        c["cpus_available"][i] -= job.cpus
+        c["memory_available"][i] -= job.memory
+        self._end_change(node, stranded)
+        self.gpus_used += job.gpus
+        self.cpus_used += job.cpus
+        self.memory_used += job.memory
+
+    def release(self, node: NodeView, job: Job, now: float):
+        c = self.columns
+        i = node.index
+        self._accrue_rows(i, now)
+        stranded = self._begin_change(node, now)
+        c["gpus_available"][i] += job.gpus
+        c["cpus_available"][i] += job.cpus
+        c["memory_available"][i] += job.memory
+        self._end_change(node, stranded)
+        self.gpus_used -= job.gpus
+        self.cpus_used -= job.cpus
+        self.memory_used -= job.memory
+
+    def accrue_energy(self, now: float):
+        self._accrue_rows(slice(None), now)
+
+    def _index(self, node: NodeView):
+        # No capacity index, fit_mask() checks the power state instead
+        pass
+
+    def _unindex(self, node: NodeView):
+        pass
+
+    def active_mask(self) -> np.ndarray:
+        c = self.columns
+        return ((c["gpus_available"] < c["gpus_total"]) |
+                (c["cpus_available"] < c["cpus_total"]) |
+                (c["memory_available"] < c["memory_total"]))
+
+    def power_draw(self) -> np.ndarray:
+        """
+        Current power draw of every node in Watts, using the same model as Node.power_draw().
+        """
+        c = self.columns
+        gpu_load = np.divide(c["gpus_total"] - c["gpus_available"], c["gpus_total"],
+                             out=np.zeros(len(self.names)), where=c["gpus_total"] > 0)
+        cpu_load = np.divide(c["cpus_total"] - c["cpus_available"], c["cpus_total"],
+                             out=np.zeros(len(self.names)), where=c["cpus_total"] > 0)
+        load = np.maximum(gpu_load, cpu_load)
+        power = c["power_idle"] + (c["power_active"] - c["power_idle"]) * load
+        power = np.where(self.active_mask(), power, c["power_idle"])
+        state = c["power_state"]
+        return np.where(state == PowerState.ON, power, np.where(state == PowerState.SLEEP, c["power_sleep"], 0.0))
+
+    def node_utilization(self) -> np.ndarray:
+        """
+        GPU utilization of every node in percent, as Node.utilization().
+        """
+        c = self.columns
+        return np.divide((c["gpus_total"] - c["gpus_available"]) * 100, c["gpus_total"],
+                         out=np.zeros(len(self.names)), where=c["gpus_total"] > 0)
+
+    def _accrue_rows(self, rows, now: float):
+        c = self.columns
+        if isinstance(rows, slice):
+            # Same suspend completion as Node.accrue_energy()
+            asleep = (c["power_state"] == PowerState.SUSPENDING) & (now >= c["transition_end"])
+            c["power_state"][asleep] = PowerState.SLEEP
+            c["energy_updated_at"][asleep] = np.maximum(c["energy_updated_at"], c["transition_end"])[asleep]
+            elapsed = np.maximum(now - c["energy_updated_at"], 0)
+            energy = self.power_draw() * elapsed / 3_600_000  # Watt-seconds to kWh
+            sleeping = c["power_state"] == PowerState.SLEEP
+            active = self.active_mask()
+            c["energy_sleep"] += np.where(sleeping, energy, 0)
+            c["energy_active"] += np.where(active & ~sleeping, energy, 0)
+            c["energy_idle"] += np.where(active | sleeping, 0, energy)
+            c["energy_consumption"] += energy
+            c["energy_updated_at"][:] = now
+            return
+        # Single row: plain Python arithmetic is much cheaper than NumPy for scalars
+        node = NodeView(self, rows)
+        Node.accrue_energy(node, now)
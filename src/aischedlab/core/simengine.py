@@ -1,57 +1,409 @@
 import simpy
+from typing import Iterable, Optional
 from aischedlab.core.models import Job, Cluster
 from aischedlab.core.strategies.fifo import FIFOScheduler
+import copy
+import heapq
+import itertools
 import logging
-import numpy as np
+import time
 from aischedlab.core.metric_collector import MetricCollector
+from aischedlab.core.metric_sink import create_sink
+from aischedlab.core.fastengine import EventType, FastEnvironment
+from aischedlab.core.instrumentation import Instrumentation
+from aischedlab.core.snapshot import Snapshot
+from aischedlab.core.tracing import TraceEvent, Tracer
 
 logger = logging.getLogger(__name__)
 
+ENGINES = ("simpy", "fast")
+
 class SimulationEngine:
-    def __init__(self, cluster: Cluster, jobs: list[Job], scheduler_cls=FIFOScheduler):
+    def __init__(self, cluster: Cluster, jobs: Iterable[Job], scheduler_cls=FIFOScheduler, engine: str = "simpy",
+                 instrument: bool = False, tracer: Optional[Tracer] = None, output_dir: str = "metrics",
+                 metric_format: str = "csv", stream_metrics: bool = False):
+        """
+        :param cluster: The cluster to simulate.
+        :param jobs: The job trace. Lists are sorted by submit time; any other iterable (e.g. a
+                     streaming trace loader) must already be in submit order and is consumed lazily.
+        :param scheduler_cls: The scheduling strategy to use.
+        :param engine: "simpy" for the simpy event loop or "fast" for the heapq-based FastEnvironment.
+                       Both produce the same metrics.
+        :param instrument: Record scheduling pass latencies, nodes scanned per placement and queue lengths.
+                           Off by default; when off the hot path only pays for a None check.
+        :param tracer: Structured trace sink for job and scheduler events. The caller closes it.
+        :param output_dir: Directory the metric files are written to.
+        :param metric_format: "csv" or "npz" (chunked NumPy columns).
+        :param stream_metrics: Write job rows and utilization samples while the run progresses instead of
+                               keeping them in memory until the end, so memory does not grow with the trace.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
         self.cluster = cluster
-        self.jobs = sorted(jobs, key=lambda j: j.submit_time)
+        if isinstance(jobs, list):
+            jobs = sorted(jobs, key=lambda j: j.submit_time)
+        self.jobs = jobs
         self.scheduler_cls = scheduler_cls
-        self.metrics = MetricCollector()
+        self.engine = engine
+        self.output_dir = output_dir
+        self.metric_format = metric_format
+        sink = create_sink(output_dir, self._metrics_prefix(), metric_format) if stream_metrics else None
+        expected_jobs = len(jobs) if isinstance(jobs, list) and sink is None else 0
+        self.metrics = MetricCollector(expected_jobs=expected_jobs, sink=sink)
+        self.instrument = instrument
+        self.instrumentation = None
+        self.tracer = tracer
+        self._env = None
+        self.paused_at = None
 
-    def run(self):
-        env = simpy.Environment()
-        scheduler = self.scheduler_cls(self.cluster)
-        done_event = env.event()  # Event to signal all jobs are done
+    def run(self, report: bool = True, until: Optional[float] = None) -> bool:
+        """
+        Run the simulation to completion, or pause it before simulated time ``until``.
 
-        # Start energy tracking process
-        env.process(self.track_energy(env, self.cluster, done_event))
+        A paused simulation continues with the next call to run() and can be captured with snapshot().
 
-        # Start all job processes and collect their events
-        job_events = []
-        for job in self.jobs:
-            job_event = env.event()
-            env.process(self._job_wrapper(scheduler, env, job, job_event, self.metrics))
-            job_events.append(job_event)
+        :param report: Export the collected metrics after the run. Streamed metrics are always finalized.
+        :param until: Stop before processing the first event at or after this simulated time.
+        :return: True if the simulation completed, False if it was paused.
+        """
+        if self._env is None:
+            self._start()
+            logger.info("Starting simulation...")
+        elif self.paused_at is None:
+            raise RuntimeError("The simulation has already completed")
+        if self.engine == "fast":
+            finished = self._run_fast(self._scheduler, self.metrics, until)
+        else:
+            finished = self._run_simpy(until)
+        if not finished:
+            self.paused_at = until
+            return False
+        self.paused_at = None
+        env = self._env
 
-        logger.info("Starting simulation...")
+        if self.instrumentation is not None:
+            self.instrumentation.stop(self.events_processed)
+            self.cluster.probe = None
+        unplaced = self.jobs_submitted - self.jobs_completed
+        if unplaced:
+            logger.warning(f"{unplaced} job(s) could not be placed on any node.")
 
-        # When all job_events are triggered, succeed the done_event
-        def all_jobs_done(env, job_events, done_event):
-            yield simpy.events.AllOf(env, job_events)
-            done_event.succeed()
-        env.process(all_jobs_done(env, job_events, done_event))
+        # Charge every node up to the end of the simulation, including trailing power transitions.
+        # The makespan (end_time) is the time of the last submission or completion.
+        self.cluster.accrue_energy(env.now)
+        for node in self.cluster.nodes:
+            self.metrics.record_energy(node)
+        self.cluster.accrue_stranded(env.now)
+        self.metrics.record_fragmentation(self.cluster, env.now)
 
-        env.run()
         logger.info("Simulation completed.")
-        self.metrics.report(output_file=f"metrics_scheduler_{self.scheduler_cls.__name__}.csv")
+        if report or self.metrics.sink is not None:
+            self.metrics.report(output_file=self._metrics_prefix(), output_dir=self.output_dir,
+                                metric_format=self.metric_format)
+        return True
+
+    def snapshot(self) -> Snapshot:
+        """
+        Capture the state of a simulation paused with ``run(until=...)``.
+
+        The snapshot is an independent copy: the cluster with its allocations and energy counters, the
+        pending queue, the running jobs with their end times, the jobs still to arrive and the metric
+        collector. Jobs of a streamed trace that have not arrived yet are read into memory.
+        """
+        if self.paused_at is None:
+            raise RuntimeError("Only a simulation paused with run(until=...) can be captured")
+        if self.metrics.sink is not None or self.tracer is not None:
+            raise RuntimeError("Simulations that stream metrics or traces cannot be captured")
+        rest = list(self._arrival_iter)
+        self._arrival_iter = iter(rest)
+        # Completions, the next arrival and strategy wake-ups, in the order their events were scheduled
+        events = [(order, end_time, job, node) for order, end_time, job, node in self._running.values()]
+        if self._next_arrival is not None:
+            order, job = self._next_arrival
+            events.append((order, job.submit_time, job, None))
+        events.extend((order, wakeup_time, None, None) for wakeup_time, order in self._timers)
+        events.sort(key=lambda event: event[0])
+        probe, self.cluster.probe = self.cluster.probe, None
+        instrumentation, self.metrics.instrumentation = self.metrics.instrumentation, None
+        try:
+            state = copy.deepcopy({
+                "cluster": self.cluster,
+                "pending": self._scheduler.pending_jobs(),
+                "events": [(end_time, job, node) for _, end_time, job, node in events],
+                "arrivals": rest,
+                "metrics": self.metrics,
+            })
+        finally:
+            self.cluster.probe = probe
+            self.metrics.instrumentation = instrumentation
+        return Snapshot(
+            time=self.paused_at,
+            scheduler_cls=self.scheduler_cls,
+            # jobs_running is not captured, restoring the running jobs counts them again
+            counters={"jobs_submitted": self.jobs_submitted, "jobs_completed": self.jobs_completed,
+                      "scheduling_passes": self.scheduling_passes, "end_time": self.end_time},
+            **state,
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot, scheduler_cls=None, engine: str = "simpy", dispatch: Optional[bool] = None,
+                      **kwargs) -> "SimulationEngine":
+        """
+        Create an engine that continues a captured simulation, optionally with another strategy.
+
+        The snapshot's cluster, jobs and metrics are used directly, so fork from a copy (e.g. an
+        unpickled snapshot in a worker process) to keep the snapshot reusable.
+
+        :param scheduler_cls: Strategy for the rest of the run; defaults to the snapshot's. A new strategy
+                              receives the pending jobs in the snapshot's queue order. Strategies that do
+                              not manage power leave sleeping and waking nodes as they are.
+        :param dispatch: Run a scheduling pass at the snapshot time, e.g. after adding nodes. By default
+                         only when the strategy changes; otherwise the resumed run matches an uninterrupted one.
+        :param kwargs: Further SimulationEngine options, e.g. ``instrument``.
+        """
+        engine_obj = cls(snapshot.cluster, snapshot.arrivals, scheduler_cls or snapshot.scheduler_cls, engine, **kwargs)
+        engine_obj.metrics = snapshot.metrics
+        if dispatch is None:
+            dispatch = engine_obj.scheduler_cls is not snapshot.scheduler_cls
+        engine_obj._start(snapshot, dispatch)
+        engine_obj.paused_at = snapshot.time
+        return engine_obj
+
+    def _metrics_prefix(self) -> str:
+        return f"metrics_scheduler_{self.scheduler_cls.__name__}.csv"
+
+    @property
+    def events_processed(self) -> int:
+        """
+        Simulated events handled by the last run: submissions, completions and scheduling passes.
+        """
+        return self.jobs_submitted + self.jobs_completed + self.scheduling_passes
+
+    def results(self) -> dict:
+        """
+        Structured results of the last run: job, node and cluster metrics plus a summary row.
+        With streamed metrics, ``jobs`` only holds the jobs that did not complete.
+        """
+        job_metrics = self.metrics.get_job_metrics()
+        node_metrics = self.metrics.get_node_metrics()
+        total_energy = sum(m["energy_consumed_kWh"] for m in node_metrics)
+        summary = {
+            "jobs_submitted": self.jobs_submitted,
+            "jobs_completed": self.jobs_completed,
+            "makespan": self.end_time,
+            "avg_waiting_time": self.metrics.average_waiting_time(),
+            "total_energy_kWh": total_energy,
+            # Whole-cluster energy, including idle, sleeping and transitioning nodes, per completed job
+            "energy_per_job_kWh": total_energy / self.jobs_completed if self.jobs_completed else 0.0,
+            "job_energy_kWh": self.metrics.job_energy_total,
+            "sleep_energy_kWh": sum(m["sleep_energy_kWh"] for m in node_metrics),
+            "transition_energy_kWh": sum(m["transition_energy_kWh"] for m in node_metrics),
+        }
+        summary.update(self.metrics.get_cluster_metrics())
+        summary.update(self.metrics.get_distribution_metrics())
+        results = {
+            "jobs": job_metrics,
+            "nodes": node_metrics,
+            "cluster": self.metrics.get_cluster_metrics(),
+            "summary": summary,
+            # Mergeable sketch states, see QuantileSketch.from_dict
+            "distributions": {name: sketch.to_dict() for name, sketch in self.metrics.distributions.items()},
+        }
+        if self.instrumentation is not None:
+            results["instrumentation"] = self.instrumentation.to_dict()
+        return results
+
+    def _start(self, snapshot: Optional[Snapshot] = None, dispatch: bool = False):
+        scheduler = self._scheduler = self.scheduler_cls(self.cluster)
+        scheduler.tracer = self.tracer
+        scheduler.engine = self
+        self.jobs_submitted = 0
+        self.jobs_running = 0
+        self.jobs_completed = 0
+        self.scheduling_passes = 0
+        self.end_time = 0
+        if snapshot is not None:
+            self.__dict__.update(snapshot.counters)
+        if self.instrument:
+            self.instrumentation = Instrumentation()
+            self.instrumentation.start()
+        self.cluster.probe = self.metrics.instrumentation = self.instrumentation
+        # Events in flight, numbered in scheduling order so a snapshot can recreate them in the same order
+        self._order = itertools.count()
+        self._running = {}  # id(job) -> (order, end time, job, node)
+        self._next_arrival = None  # (order, job) of the job the arrival process waits for
+        self._timers = []  # Heap of (time, order) of pending strategy wake-ups
+        self._arrival_iter = iter(self.jobs)
+        self._last_submit_time = float("-inf")
+
+        # A resumed run also starts its clock at 0, so restored events are scheduled at their exact
+        # absolute times; the clock then jumps straight to the first of them
+        if self.engine == "fast":
+            env = self._env = FastEnvironment()
+        else:
+            env = self._env = simpy.Environment()
+            self._wakeup = env.event()  # Triggered on every submission and completion
+            # Start the central dispatcher that runs the scheduling passes
+            env.process(self._dispatcher(env, scheduler, self.metrics))
+        if snapshot is None:
+            if self.engine == "fast":
+                self._submit_arrivals(env, scheduler, self._arrival_iter, self.metrics)
+            else:
+                # A single arrival process submits jobs as simulated time reaches their submit time
+                env.process(self._arrivals(env, scheduler, self.metrics))
+            return
+
+        for job in snapshot.pending:
+            scheduler.submit(job)
+        arrival = None
+        for end_time, job, node in snapshot.events:
+            if job is None:
+                self.schedule_wakeup(end_time)
+                continue
+            if node is None:
+                arrival = (self._schedule_arrival(env, job), job)
+                continue
+            scheduler.restore_running(env, job, node, end_time)
+            self._schedule_finish(env, scheduler, job, node, end_time, self.metrics)
+        if self.engine == "fast":
+            if dispatch:
+                env.request_dispatch(delay=snapshot.time)
+            return
+        env.process(self._arrivals(env, scheduler, self.metrics, arrival))
+        if dispatch:
+            env.timeout(snapshot.time).callbacks.append(lambda _event: self._wake())
+
+    def _run_simpy(self, until: Optional[float]) -> bool:
+        env = self._env
+        # Step manually rather than env.run(until) so a paused run does not advance the clock
+        while env.peek() < (until if until is not None else float("inf")):
+            env.step()
+        return env.peek() == float("inf")
+
+    def _run_fast(self, scheduler, metrics: MetricCollector, until: Optional[float]) -> bool:
+        # Same flow as the simpy processes, written as a plain event loop
+        env = self._env
+        arrivals = self._arrival_iter
+        for event in env.events(until):
+            if event.type is EventType.SUBMIT:
+                self._next_arrival = None
+                self._submit_job(env, scheduler, event.job, metrics)
+                self._submit_arrivals(env, scheduler, arrivals, metrics)
+            elif event.type is EventType.FINISH:
+                self._finish_job(scheduler, env, event.job, event.node, metrics)
+            elif event.type is EventType.TIMER:
+                self._fire_wakeup()
+            else:
+                for job, node in self._schedule_pass(scheduler, env, metrics):
+                    self._schedule_finish(env, scheduler, job, node, job.duration, metrics)
+        return env.empty()
+
+    def _schedule_finish(self, env, scheduler, job: Job, node, delay: float, metrics: MetricCollector):
+        self.jobs_running += 1
+        self._running[id(job)] = (next(self._order), env.now + delay, job, node)
+        if isinstance(env, FastEnvironment):
+            env.schedule(delay, EventType.FINISH, job, node)
+            return
+        finish = env.timeout(delay)
+        finish.callbacks.append(
+            lambda _event, job=job, node=node: self._finish_job(scheduler, env, job, node, metrics))
+
+    def _schedule_arrival(self, env, job: Job):
+        self._next_arrival = (next(self._order), job)
+        if isinstance(env, FastEnvironment):
+            env.schedule(job.submit_time - env.now, EventType.SUBMIT, job)
+            return None
+        return env.timeout(job.submit_time - env.now)
+
+    def schedule_wakeup(self, delay: float):
+        """
+        Schedule an extra scheduling pass ``delay`` from now, for strategies that wait for something
+        other than a submission or completion, e.g. a node that finishes powering on.
+        """
+        env = self._env
+        heapq.heappush(self._timers, (env.now + delay, next(self._order)))
+        if isinstance(env, FastEnvironment):
+            env.schedule(delay, EventType.TIMER)
+            return
+        env.timeout(delay).callbacks.append(lambda _event: self._fire_wakeup())
+
+    def _fire_wakeup(self):
+        # Wake-ups fire in (time, scheduling order), which is the heap order
+        heapq.heappop(self._timers)
+        # Strategies wait for capacity, e.g. a node that powered on, so the pass rechecks every pending job
+        self._scheduler.capacity_released()
+        self._wake()
+
+    def _wake(self):
+        if isinstance(self._env, FastEnvironment):
+            self._env.request_dispatch()
+        elif not self._wakeup.triggered:
+            self._wakeup.succeed()
+
+    def _dispatcher(self, env, scheduler, metrics: MetricCollector):
+        # Sleep until a job is submitted or completes, then give the strategy one pass
+        while True:
+            yield self._wakeup
+            self._wakeup = env.event()
+            for job, node in self._schedule_pass(scheduler, env, metrics):
+                self._schedule_finish(env, scheduler, job, node, job.duration, metrics)
+
+    def _schedule_pass(self, scheduler, env, metrics: MetricCollector):
+        self.scheduling_passes += 1
+        if self.instrumentation is None:
+            return scheduler.schedule(env, metrics)
+        start = time.perf_counter_ns()
+        started = scheduler.schedule(env, metrics)
+        self.instrumentation.record_pass(env.now, time.perf_counter_ns() - start, scheduler.queue_length())
+        return started
+
+    def _finish_job(self, scheduler, env, job, node, metrics: MetricCollector):
+        scheduler.finish_job(env, job, node, metrics)
+        del self._running[id(job)]
+        self.jobs_running -= 1
+        self.jobs_completed += 1
+        self.end_time = env.now
+        self._wake()
+
+    def _arrivals(self, env, scheduler, metrics: MetricCollector, pending=None):
+        if pending is not None:
+            # Resumed from a snapshot: finish waiting for the arrival that was already scheduled
+            event, job = pending
+            yield event
+            self._next_arrival = None
+            self._submit_job(env, scheduler, job, metrics)
+        # Look the iterator up on every step, snapshot() may replace it with a copy of the remaining jobs
+        while (job := next(self._arrival_iter, None)) is not None:
+            self._check_order(env, job)
+            if job.submit_time > env.now:
+                yield self._schedule_arrival(env, job)
+                self._next_arrival = None
+            self._submit_job(env, scheduler, job, metrics)
+
+    def _submit_arrivals(self, env: FastEnvironment, scheduler, arrivals, metrics: MetricCollector):
+        # Submit every job due now and schedule the next future arrival
+        for job in arrivals:
+            self._check_order(env, job)
+            if job.submit_time > env.now:
+                self._schedule_arrival(env, job)
+                return
+            self._submit_job(env, scheduler, job, metrics)
 
-    @staticmethod
-    def track_energy(env, cluster: Cluster, done_event, interval=1):
-        while not done_event.triggered:
-            for node in cluster.nodes:
-                node.energy_consumption += node.power_active * interval / 3600  # Convert Watts to kWh
-            yield env.timeout(interval)
+    def _check_order(self, env, job: Job):
+        # Compare with the previous job rather than env.now, which carries the rounding of the arrival delay
+        if job.submit_time < self._last_submit_time:
+            raise ValueError(f"Job {job.name} submitted at {job.submit_time} arrives after a job submitted at "
+                             f"{self._last_submit_time}; job iterators must be sorted by submit_time")
+        self._last_submit_time = job.submit_time
 
-    @staticmethod
-    def _job_wrapper(scheduler, env, job, job_event, metrics: MetricCollector):
-        yield from scheduler.schedule(env, job, metrics)
-        job_event.succeed()
+    def _submit_job(self, env, scheduler, job: Job, metrics: MetricCollector):
+        if self.tracer is not None:
+            self.tracer.emit(TraceEvent.SUBMIT, env.now, job)
+        metrics.record_job_submission(job, env)
+        scheduler.submit(job)
+        self.jobs_submitted += 1
+        self.end_time = env.now
+        self._wake()
 
     def print_summary(self):
         logger.info("Simulation Summary:")
@@ -63,18 +415,15 @@ class SimulationEngine:
             logger.info(f"  Energy Consumption: {node.energy_consumption:.2f} kWh")
         total_energy = sum(node.energy_consumption for node in self.cluster.nodes)
         logger.info(f"Total Energy Consumption: {total_energy:.2f} kWh")
+        if self.jobs_completed:
+            logger.info(f"Energy per Completed Job: {total_energy / self.jobs_completed:.4f} kWh")
 
-        # --- Waiting time metrics ---
-        waiting_times = [getattr(job, "waiting_time", 0) for job in self.jobs]
-        if waiting_times:
-            avg_wait = np.mean(waiting_times)
-            q25 = np.quantile(waiting_times, 0.25)
-            q50 = np.quantile(waiting_times, 0.5)
-            q75 = np.quantile(waiting_times, 0.75)
-            logger.info("Job Waiting Time Statistics:")
-            for job in self.jobs:
-                logger.info(f"  Job {job.name}: Waiting Time = {getattr(job, 'waiting_time', 0)}")
-            logger.info(f"  Average Waiting Time: {avg_wait:.2f}")
-            logger.info(f"  25th Percentile: {q25:.2f}")
-            logger.info(f"  Median: {q50:.2f}")
-            logger.info(f"  75th Percentile: {q75:.2f}")
\ No newline at end of file
+        # --- Job distributions ---
+        # Streamed from the metric collector's sketches, so memory does not depend on the trace length
+        for name, sketch in self.metrics.distributions.items():
+            if sketch.count == 0:
+                continue
+            logger.info(f"Job {name.replace('_', ' ').title()} Statistics:")
+            logger.info(f"  Average: {sketch.mean():.2f}")
+            for quantile, value in sketch.quantiles().items():
+                logger.info(f"  {quantile}: {value:.2f}")
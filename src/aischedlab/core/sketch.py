@@ -0,0 +1,141 @@
+import math
+from typing import Iterable
+
+# Quantiles reported for every distribution
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile estimator with a relative error guarantee (DDSketch).
+
+    Positive values are counted in logarithmic buckets ``(gamma ** (i - 1), gamma ** i]`` with
+    ``gamma = (1 + accuracy) / (1 - accuracy)``, so every quantile is returned within ``accuracy``
+    of a value of the right rank. Values at or below ``min_value`` (e.g. zero waits) share one bucket.
+    Memory is bounded by ``max_buckets``: beyond it the lowest buckets are collapsed, which only
+    affects the accuracy of the smallest quantiles. Sketches with the same parameters merge exactly.
+    """
+
+    def __init__(self, accuracy: float = 0.01, max_buckets: int = 2048, min_value: float = 1e-9):
+        if not 0 < accuracy < 1:
+            raise ValueError("accuracy must be between 0 and 1")
+        self.accuracy = accuracy
+        self.max_buckets = max_buckets
+        self.min_value = min_value
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= self.min_value:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        buckets = self.buckets
+        buckets[index] = buckets.get(index, 0) + 1
+        if len(buckets) > self.max_buckets:
+            self._collapse()
+
+    def update(self, values: Iterable[float]):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "QuantileSketch"):
+        """
+        Add the counts of a sketch with the same accuracy, e.g. from a parallel run, to this one.
+        """
+        if other.gamma != self.gamma or other.min_value != self.min_value:
+            raise ValueError("Only sketches with the same accuracy and min_value can be merged")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        while len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return self.min
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Midpoint of the bucket in relative terms, clamped to the values actually seen
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def quantiles(self, qs: Iterable[float] = QUANTILES) -> dict[str, float]:
+        """
+        Quantiles keyed as ``p50``, ``p90``, ``p99``, ``p99.9``.
+        """
+        return {f"p{q * 100:g}": self.quantile(q) for q in qs}
+
+    def to_dict(self) -> dict:
+        """
+        JSON-serializable state, e.g. to store with cached results and merge later.
+        """
+        return {
+            "accuracy": self.accuracy,
+            "max_buckets": self.max_buckets,
+            "min_value": self.min_value,
+            "buckets": {str(index): count for index, count in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "QuantileSketch":
+        sketch = cls(state["accuracy"], state["max_buckets"], state["min_value"])
+        sketch.buckets = {int(index): count for index, count in state["buckets"].items()}
+        sketch.zero_count = state["zero_count"]
+        sketch.count = state["count"]
+        sketch.total = state["total"]
+        if sketch.count:
+            sketch.min = state["min"]
+            sketch.max = state["max"]
+        return sketch
+
+    def _collapse(self):
+        # Fold the lowest bucket into the next one
+        lowest, second = sorted(self.buckets)[:2]
+        self.buckets[second] += self.buckets.pop(lowest)
+
+def merge_sketches(states: Iterable[dict]) -> QuantileSketch:
+    """
+    Merge serialized sketches, e.g. the ``distributions`` of several runs' results, into one.
+    """
+    merged = None
+    for state in states:
+        sketch = QuantileSketch.from_dict(state)
+        if merged is None:
+            merged = sketch
+        else:
+            merged.merge(sketch)
+    if merged is None:
+        raise ValueError("No sketches to merge")
+    return merged
@@ -0,0 +1,31 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from aischedlab.core.metric_collector import MetricCollector
+from aischedlab.core.models import Cluster, Job, Node
+
+@dataclass
+class Snapshot:
+    """
+    State of a simulation paused at ``time``, taken with SimulationEngine.snapshot().
+
+    Continue it with SimulationEngine.from_snapshot(). Snapshots pickle, so what-if variants can
+    be forked from one in worker processes.
+    """
+    time: float
+    scheduler_cls: type
+    cluster: Cluster  # With the allocations of the running jobs and energy accrued so far
+    pending: list[Job]  # Submitted but not started, in the scheduler's queue order
+    # (end time, job, node) of running jobs, (submit time, job, None) of the next arrival and
+    # (time, None, None) of strategy wake-ups, in scheduling order
+    events: list[tuple[float, Job, Optional[Node]]]
+    arrivals: list[Job]  # Jobs after the next arrival, in submit order
+    metrics: MetricCollector
+    counters: dict  # Engine counters: jobs_submitted, jobs_completed, scheduling_passes, end_time
+
+    def running_jobs(self) -> list[tuple[Job, Node, float]]:
+        """
+        Running jobs with their nodes and remaining run time.
+        """
+        return [(job, node, end_time - self.time) for end_time, job, node in self.events
+                if job is not None and node is not None]
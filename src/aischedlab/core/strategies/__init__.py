@@ -1,3 +1,15 @@
 from .fifo import FIFOScheduler
-from .sjf import SJFJobScheduler
+from .sjf import SJFJobScheduler, ShortestAreaFirstScheduler
 from .backfill import BackfillScheduler
+from .bestfit import BestFitScheduler
+from .consolidation import ConsolidationScheduler
+
+# Strategies selectable by name from the command-line tools
+SCHEDULERS = {
+    'fifo': FIFOScheduler,
+    'sjf': SJFJobScheduler,
+    'saf': ShortestAreaFirstScheduler,
+    'backfill': BackfillScheduler,
+    'bestfit': BestFitScheduler,
+    'consolidate': ConsolidationScheduler,
+}
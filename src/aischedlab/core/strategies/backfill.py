@@ -1,93 +1,150 @@
-from aischedlab.core.models import Job, Cluster
+from aischedlab.core.models import Job, Node, Cluster
+import itertools
 import simpy
 import logging
+from bisect import bisect_left, insort
+from typing import NamedTuple, Optional
 
-from aischedlab.core.base_scheduler import BaseScheduler
 from aischedlab.core.metric_collector import MetricCollector  # Ensure correct import
+from aischedlab.core.strategies.fifo import FIFOScheduler
+from aischedlab.core.tracing import TraceEvent
 
 logger = logging.getLogger(__name__)
 
-class BackfillScheduler(BaseScheduler):
+class Reservation(NamedTuple):
+    shadow_time: float  # Earliest time the head job can start
+    node: Node  # Node the head job is reserved on
+    extra_gpus: int  # Resources on that node left over at shadow time
+    extra_cpus: int
+    extra_memory: int
+
+class AvailabilityProfile:
+    """
+    Future free capacity of the cluster, derived from the expected end times of running jobs.
+
+    Running jobs are kept sorted by expected end time, so walking the profile visits the
+    points in time at which capacity is released in order.
+    """
+
+    def __init__(self):
+        self._releases = []  # Sorted (end_time, sequence, job, node)
+        self._entries = {}
+        self._sequence = itertools.count()
+
+    def __len__(self):
+        return len(self._releases)
+
+    def add(self, job: Job, node: Node, end_time: float):
+        entry = (end_time, next(self._sequence), job, node)
+        insort(self._releases, entry)
+        self._entries[id(job)] = entry
+
+    def remove(self, job: Job):
+        entry = self._entries.pop(id(job))
+        # (end_time, sequence) sorts directly before its full entry and is unique
+        del self._releases[bisect_left(self._releases, entry[:2])]
+
+    def reservation(self, job: Job) -> Optional[Reservation]:
+        """
+        Find the earliest time and node at which a job fits once running jobs release their resources.
+
+        :return: The reservation, or None if the job does not fit on any node even when it is empty.
+        """
+        free = {}
+        for end_time, _, running, node in self._releases:
+            gpus, cpus, memory = free.get(node.name, (node.gpus_available, node.cpus_available, node.memory_available))
+            gpus += running.gpus
+            cpus += running.cpus
+            memory += running.memory
+            free[node.name] = (gpus, cpus, memory)
+            if gpus >= job.gpus and cpus >= job.cpus and memory >= job.memory:
+                return Reservation(end_time, node, gpus - job.gpus, cpus - job.cpus, memory - job.memory)
+        return None
+
+class BackfillScheduler(FIFOScheduler):
+    """
+    EASY backfilling: jobs start in submission order; when the head job does not fit, it gets a
+    reservation at its shadow time and later jobs may start only if they do not delay it. Jobs that
+    do not fit on any node even when it is empty are passed over and do not hold the reservation.
+    """
+    version = "3"
+
     def __init__(self, cluster: Cluster):
         super().__init__(cluster)
-    
-    def schedule(self, env: simpy.Environment, job: Job, metrics: MetricCollector):
-        yield env.timeout(job.submit_time - env.now)
-        logger.info(f"[{env.now}] Job {job.name} submitted")
-        metrics.record_job_submission(job, env)
-
-        self.jobs.append(job)
-
-        while True:
-            if not self.jobs:
-                logger.info(f"[{env.now}] No jobs to schedule, exiting scheduler for job {job.name}.")
-                break  # Exit the loop and end this process
-
-            # Sort jobs by their submit time
-            self.jobs.sort(key=lambda j: j.submit_time)
-            primary_job = self.jobs[0]
-            earliest_start = self._find_earliest_start(env, primary_job)
-
-            for job in self.jobs:
-                if self._can_backfill(job, earliest_start):
-                    if job in self.jobs:
-                        self.jobs.remove(job)
-                    logger.info(f"[{env.now}] Job {job.name} backfilled")
-                    env.process(self._run_job(env, job, metrics))
-                    break
-                else:
-                    logger.info(f"[{env.now}] No job can be backfilled, waiting...")
-                    if self._can_schedule(primary_job):
-                        if primary_job in self.jobs:
-                            self.jobs.remove(primary_job)
-                        env.process(self._run_job(env, primary_job, metrics))
-                    else:
-                        yield env.timeout(1)
-    
-    def _run_job(self, env, job: Job, metrics: MetricCollector):
-        node = self._find_available_node(job)
-        if not node:
-            logger.warning(f"[{env.now}] No available node for job {job.name}")
-            return
-
-        # Set waiting time and record job start
-        job.waiting_time = env.now - job.submit_time
-        metrics.record_job_start(job, env)
-        metrics.record_utilization(env, self.cluster)
-
-        node.gpus_available -= job.gpus
-        node.cpus_available -= job.cpus
-        node.memory_available -= job.memory
-        logger.info(f"[{env.now}] Job {job.name} scheduled on node {node.name}")
-        yield env.timeout(job.duration)
-        logger.info(f"[{env.now}] Job {job.name} completed on node {node.name}")
-
-        node.gpus_available += job.gpus
-        node.cpus_available += job.cpus
-        node.memory_available += job.memory
-
-        metrics.record_job_end(job, env)
-        metrics.record_utilization(env, self.cluster)
-        metrics.record_energy(node)
-
-    def _can_schedule(self, job: Job) -> bool:
-        return any(node.gpus_available >= job.gpus and
-                   node.cpus_available >= job.cpus and
-                   node.memory_available >= job.memory for node in self.cluster.nodes)
-    
-    def _find_available_node(self, job: Job):
-        for node in self.cluster.nodes:
-            if (node.gpus_available >= job.gpus and
-                node.cpus_available >= job.cpus and
-                node.memory_available >= job.memory):
-                logger.info(f"Found available node {node.name} for job {job.name}")
-                return node
-        return None
-    
-    def _find_earliest_start(self, env, job: Job) -> int:
-        logger.info(f"Finding earliest start time for job {job.name}")
-        return env.now + min((j.submit_time for j in self.jobs if j != job), default=env.now)
-    
-    def _can_backfill(self, job: Job, earliest_start: int):
-        logger.info(f"Checking if job {job.name} can be backfilled at time {earliest_start}")
-        return earliest_start < job.submit_time and self._can_schedule(job)
\ No newline at end of file
+        self.profile = AvailabilityProfile()
+        # Reservation of the first waiting job, kept until capacity is released
+        self.reservation = None
+
+    def start_job(self, env: simpy.Environment, job: Job, node: Node, metrics: MetricCollector):
+        super().start_job(env, job, node, metrics)
+        self.profile.add(job, node, env.now + job.duration)
+
+    def restore_running(self, env: simpy.Environment, job: Job, node: Node, end_time: float):
+        self.profile.add(job, node, end_time)
+
+    def finish_job(self, env: simpy.Environment, job: Job, node: Node, metrics: MetricCollector):
+        self.profile.remove(job)
+        super().finish_job(env, job, node, metrics)
+
+    def schedule(self, env: simpy.Environment, metrics: MetricCollector):
+        started = []
+        failed_shapes = []
+
+        def start(job: Job) -> bool:
+            node = self.find_fit(job, failed_shapes)
+            if self.reservation is None:
+                # Nothing reserved yet: start in order
+                if node is None:
+                    # A job that never fits is passed over, the reservation goes to the next job that does not fit now
+                    self.reservation = self.profile.reservation(job)
+                    if self.tracer is not None:
+                        self.tracer.emit(TraceEvent.RESERVE if self.reservation is not None else TraceEvent.WAIT,
+                                         env.now, job, self.reservation.node if self.reservation is not None else None)
+                    return False
+            else:
+                node, self.reservation = self._backfill_node(env, job, node, self.reservation)
+                if node is None:
+                    return False
+                if self.tracer is not None:
+                    self.tracer.emit(TraceEvent.BACKFILL, env.now, job, node)
+            self.start_job(env, job, node, metrics)
+            started.append((job, node))
+            return True
+
+        def fits(job: Job) -> bool:
+            # Until a job holds the reservation every waiting job is offered, so the next one can take it.
+            # After that a group is skipped once its smallest and shortest request cannot be backfilled.
+            if self.reservation is None:
+                return True
+            node = self.find_fit(job, failed_shapes)
+            return node is not None and self._backfill_node(env, job, node, self.reservation)[0] is not None
+
+        # Without released capacity the waiting jobs and the reservation stand, only new jobs are tried.
+        # Otherwise the reservation is made again: the reserved job may start now or earlier than reserved.
+        new_only = not self.rescan
+        if self.rescan:
+            self.reservation = None
+        self.rescan = False
+        self.queue.offer(start, fits, new_only)
+        return started
+
+    def _backfill_node(self, env, job: Job, node: Optional[Node], reservation: Reservation):
+        """
+        Pick a node for a backfill candidate that does not delay the reserved head job.
+
+        :return: The node (or None) and the reservation with its extra resources updated.
+        """
+        if node is None:
+            return node, reservation
+        if env.now + job.duration <= reservation.shadow_time:
+            # Finishes before the head job starts
+            return node, reservation
+        if node.name != reservation.node.name:
+            return node, reservation
+        if (job.gpus <= reservation.extra_gpus and job.cpus <= reservation.extra_cpus and
+                job.memory <= reservation.extra_memory):
+            # Runs past the shadow time on the reserved node, but only uses resources the head job leaves over
+            return node, reservation._replace(extra_gpus=reservation.extra_gpus - job.gpus,
+                                              extra_cpus=reservation.extra_cpus - job.cpus,
+                                              extra_memory=reservation.extra_memory - job.memory)
+        return self.cluster.find_node(job, exclude=reservation.node), reservation
@@ -0,0 +1,57 @@
+from aischedlab.core.models import Job, Node
+import logging
+from typing import Optional
+from aischedlab.core.strategies.fifo import FIFOScheduler
+
+logger = logging.getLogger(__name__)
+
+def fragmentation_score(node: Node, job: Job) -> tuple:
+    """
+    Score of placing a job on a node, lower is better.
+
+    In order of priority: the change in stranded GPUs (free GPUs on nodes that run a job), so jobs
+    fill partially used nodes before opening idle ones; the GPUs left free on the node (best fit);
+    and the CPU and memory left free as fractions of the node (tetris-style packing of the rest).
+    """
+    leftover_gpus = node.gpus_available - job.gpus
+    stranded_change = leftover_gpus - (node.gpus_available if node.is_active() else 0)
+    leftover = 0.0
+    if node.cpus_total > 0:
+        leftover += (node.cpus_available - job.cpus) / node.cpus_total
+    if node.memory_total > 0:
+        leftover += (node.memory_available - job.memory) / node.memory_total
+    return (stranded_change, leftover_gpus, leftover)
+
+class BestFitScheduler(FIFOScheduler):
+    """
+    Greedy scheduling in submission order that places every job on the node with the lowest
+    fragmentation score instead of the first node that fits, keeping whole nodes free for large
+    multi-GPU jobs.
+    """
+
+    def select_node(self, job: Job) -> Optional[Node]:
+        return self.best_node(job)
+
+    def best_node(self, job: Job) -> Optional[Node]:
+        """
+        The fitting node with the lowest fragmentation score, or None if no node fits.
+        """
+        best = None
+        best_score = None
+        active_level = None
+        scanned = 0
+        # Candidates come with the fewest free GPUs first. Once a busy node fits, nodes with more
+        # free GPUs can only score worse, so the scan stops after that level. Idle nodes of the same
+        # shape score the same, so only the first of each shape is a candidate.
+        for node in self.cluster.fitting_nodes(job, distinct_idle=True):
+            if active_level is not None and node.gpus_available > active_level:
+                break
+            scanned += 1
+            score = fragmentation_score(node, job)
+            if best_score is None or score < best_score:
+                best, best_score = node, score
+            if active_level is None and node.is_active():
+                active_level = node.gpus_available
+        if self.cluster.probe is not None:
+            self.cluster.probe.record_placement(scanned)
+        return best
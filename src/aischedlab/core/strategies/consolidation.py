@@ -0,0 +1,125 @@
+from aischedlab.core.models import Job, Node, Cluster, PowerState
+import itertools
+import simpy
+import logging
+from aischedlab.core.metric_collector import MetricCollector
+from aischedlab.core.strategies.bestfit import BestFitScheduler
+from aischedlab.core.tracing import TraceEvent
+
+logger = logging.getLogger(__name__)
+
+class ConsolidationScheduler(BestFitScheduler):
+    """
+    Energy-saving strategy: packs jobs onto as few powered nodes as possible with the best-fit
+    placement and puts idle nodes to sleep. Sleeping nodes are woken only for queued jobs that
+    cannot start on the powered nodes, so jobs wait at most a wake-up latency longer than with
+    best fit while idle capacity costs sleep power instead of idle power.
+    """
+    # Idle nodes kept powered to absorb arrivals without a wake-up delay
+    spare_nodes = 0
+
+    def __init__(self, cluster: Cluster):
+        super().__init__(cluster)
+        # Power bookkeeping by node name, rebuilt from the cluster so a resumed run picks up its power states.
+        # Decisions never depend on the order of these dicts, ties are broken by node name.
+        self._idle = {}
+        self._asleep = {}
+        self._waking = {}
+        for node in cluster.nodes:
+            if node.power_state == PowerState.ON:
+                if not node.is_active():
+                    self._idle[node.name] = node
+            elif node.power_state == PowerState.WAKING:
+                self._waking[node.name] = node
+            else:
+                self._asleep[node.name] = node
+
+    def schedule(self, env: simpy.Environment, metrics: MetricCollector):
+        now = env.now
+        for name, node in list(self._waking.items()):
+            if node.transition_end <= now:
+                self.cluster.finish_wake(node, now)
+                del self._waking[name]
+                self._idle[name] = node
+                self.capacity_released()
+        started = super().schedule(env, metrics)
+        # Nodes still idle after the pass cannot host any queued job, so suspend them before waking others
+        self._suspend_idle(now)
+        if self.queue_length() and self._asleep:
+            self._wake_for_queue(now)
+        return started
+
+    def start_job(self, env: simpy.Environment, job: Job, node: Node, metrics: MetricCollector):
+        super().start_job(env, job, node, metrics)
+        self._idle.pop(node.name, None)
+
+    def finish_job(self, env: simpy.Environment, job: Job, node: Node, metrics: MetricCollector):
+        super().finish_job(env, job, node, metrics)
+        if not node.is_active():
+            self._idle[node.name] = node
+
+    def _wake_for_queue(self, now: float):
+        # Free capacity the waking nodes will bring, claimed by queued jobs in queue order
+        capacity = [[node.gpus_total, node.cpus_total, node.memory_total]
+                    for _, node in sorted(self._waking.items())]
+
+        def claim(job: Job):
+            shape = (job.gpus, job.cpus, job.memory)
+            claimed = next((free for free in capacity if _fits(free, shape)), None)
+            if claimed is None:
+                node = self._smallest_sleeping_node(shape)
+                if node is None:
+                    return None
+                claimed = [node.gpus_total, node.cpus_total, node.memory_total]
+                capacity.append(claimed)
+                self._wake(node, now)
+            for i, amount in enumerate(shape):
+                claimed[i] -= amount
+            return claimed
+
+        # Claimed capacity only shrinks and sleeping nodes are only taken, so failed requests fail again
+        failed_shapes = []
+        most_gpus = max(node.gpus_total for node in itertools.chain(self._asleep.values(), self._waking.values()))
+        for job in self.queue.jobs(max_gpus=most_gpus):
+            self.find_fit(job, failed_shapes, claim)
+            if not self._asleep:
+                break
+
+    def _smallest_sleeping_node(self, shape: tuple):
+        # Wake the node that fits with the fewest GPUs, keeping large nodes asleep for large jobs
+        best = None
+        best_key = None
+        for name, node in self._asleep.items():
+            if _fits((node.gpus_total, node.cpus_total, node.memory_total), shape):
+                key = (node.gpus_total, name)
+                if best_key is None or key < best_key:
+                    best, best_key = node, key
+        return best
+
+    def _wake(self, node: Node, now: float):
+        del self._asleep[node.name]
+        ready = self.cluster.wake(node, now)
+        if self.tracer is not None:
+            self.tracer.emit(TraceEvent.WAKE, now, node=node)
+        if node.power_state == PowerState.ON:
+            # No wake latency: the node can take jobs in the next pass
+            self._idle[node.name] = node
+            self.request_wakeup(0)
+        else:
+            self._waking[node.name] = node
+            self.request_wakeup(ready - now)
+
+    def _suspend_idle(self, now: float):
+        if len(self._idle) <= self.spare_nodes:
+            return
+        # Keep the spare nodes with the most GPUs powered
+        idle = sorted(self._idle.values(), key=lambda node: (-node.gpus_total, node.name))
+        for node in idle[self.spare_nodes:]:
+            del self._idle[node.name]
+            self.cluster.suspend(node, now)
+            self._asleep[node.name] = node
+            if self.tracer is not None:
+                self.tracer.emit(TraceEvent.SUSPEND, now, node=node)
+
+def _fits(free, shape: tuple) -> bool:
+    return free[0] >= shape[0] and free[1] >= shape[1] and free[2] >= shape[2]
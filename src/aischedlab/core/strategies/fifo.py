@@ -1,52 +1,187 @@
-from aischedlab.core.models import Job, Cluster
+from aischedlab.core.models import Job, Node, Cluster
+import heapq
+import itertools
 import simpy
 import logging
+from typing import Callable, Optional
 from aischedlab.core.base_scheduler import BaseScheduler
 from aischedlab.core.metric_collector import MetricCollector
+from aischedlab.core.tracing import TraceEvent
 
 logger = logging.getLogger(__name__)
 
+class _Group:
+    """
+    Pending jobs that request the same number of GPUs, with a lower bound of their CPU and memory requests
+    and durations.
+    """
+
+    def __init__(self, job: Job):
+        self.heap = []  # (key, sequence, job)
+        # Smallest request of the group; only lowered, the group is dropped once it is empty
+        self.floor = Job(name=f"floor_{job.gpus}", submit_time=0, duration=job.duration, gpus=job.gpus,
+                         cpus=job.cpus, memory=job.memory)
+
+    def add(self, entry: tuple):
+        job, floor = entry[2], self.floor
+        if job.cpus < floor.cpus:
+            floor.cpus = job.cpus
+        if job.memory < floor.memory:
+            floor.memory = job.memory
+        if job.duration < floor.duration:
+            floor.duration = job.duration
+        heapq.heappush(self.heap, entry)
+
+class PendingQueue:
+    """
+    Pending jobs in priority order, grouped by the number of GPUs they request.
+
+    A pass offers the jobs in key order across all groups. Free capacity only shrinks during a pass,
+    so once the smallest request of a group fits nowhere, the rest of the group is skipped without
+    looking at its jobs, and a pass over a deep queue stops soon after the free capacity is used up.
+    """
+
+    def __init__(self, key: Optional[Callable[[Job], float]] = None):
+        """
+        :param key: Priority of a job, smallest first. Ties, and every job without a key, go in push order.
+        """
+        self.key = key
+        self._groups = {}  # GPUs requested -> _Group
+        self._arrived = []  # Entries pushed since the last pass
+        self._sequence = itertools.count()
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def push(self, job: Job):
+        sequence = next(self._sequence)
+        self._arrived.append((self.key(job) if self.key is not None else sequence, sequence, job))
+        self._length += 1
+
+    def jobs(self, max_gpus: Optional[int] = None) -> list[Job]:
+        """
+        The pending jobs in key order.
+
+        :param max_gpus: Only the jobs requesting at most this many GPUs.
+        """
+        if max_gpus is None:
+            entries = list(self._arrived)
+        else:
+            entries = [entry for entry in self._arrived if entry[2].gpus <= max_gpus]
+        for gpus, group in self._groups.items():
+            if max_gpus is None or gpus <= max_gpus:
+                entries.extend(group.heap)
+        return [job for _, _, job in sorted(entries)]
+
+    def head(self) -> Optional[Job]:
+        """
+        The first pending job in key order, or None if the queue is empty.
+        """
+        entries = [group.heap[0] for group in self._groups.values()]
+        if self._arrived:
+            entries.append(min(self._arrived))
+        return min(entries)[2] if entries else None
+
+    def offer(self, start: Callable[[Job], bool], fits: Callable[[Job], bool], new_only: bool = False):
+        """
+        Offer pending jobs to ``start`` in key order; the jobs it starts (returns True for) leave the queue.
+
+        :param start: Tries to start a job and returns whether it did.
+        :param fits: Whether a request (a group's smallest) can still start; the rest of its group is skipped otherwise.
+        :param new_only: Only offer the jobs pushed since the last pass, enough when no capacity was released since.
+        """
+        arrived = sorted(self._arrived)
+        self._arrived = []
+        if new_only:
+            for entry in arrived:
+                if start(entry[2]):
+                    self._length -= 1
+                else:
+                    self._add(entry)
+            return
+
+        for entry in arrived:
+            self._add(entry)
+        heads = [(group.heap[0], gpus) for gpus, group in self._groups.items()]
+        heapq.heapify(heads)
+        deferred = []
+        starts = 0
+        checked = {}  # GPUs -> starts when the group's smallest request last fitted
+        while heads:
+            entry, gpus = heapq.heappop(heads)
+            group = self._groups[gpus]
+            heapq.heappop(group.heap)
+            if start(entry[2]):
+                starts += 1
+                self._length -= 1
+            else:
+                deferred.append(entry)
+                # Recheck the group only after something started, the capacity is unchanged otherwise
+                if checked.get(gpus) != starts:
+                    if not fits(group.floor):
+                        continue
+                    checked[gpus] = starts
+            if group.heap:
+                heapq.heappush(heads, (group.heap[0], gpus))
+
+        for entry in deferred:
+            heapq.heappush(self._groups[entry[2].gpus].heap, entry)
+        for gpus in [gpus for gpus, group in self._groups.items() if not group.heap]:
+            # Dropped so the floor of a later group starts from its own jobs
+            del self._groups[gpus]
+
+    def _add(self, entry: tuple):
+        job = entry[2]
+        group = self._groups.get(job.gpus)
+        if group is None:
+            group = self._groups[job.gpus] = _Group(job)
+        group.add(entry)
+
 class FIFOScheduler(BaseScheduler):
-    def __init__(self, cluster: Cluster):
+    """
+    Greedy scheduling in submission order: every pass starts each pending job that fits, on the
+    first node that fits, and jobs that do not fit keep waiting without blocking later ones.
+    """
+
+    def __init__(self, cluster: Cluster, key: Optional[Callable[[Job], float]] = None):
+        """
+        :param key: Order of the pending jobs, smallest first; submission order if None.
+        """
         super().__init__(cluster)
+        self.queue = PendingQueue(key)
+
+    def submit(self, job: Job):
+        self.queue.push(job)
+
+    def pending_jobs(self) -> list[Job]:
+        return self.queue.jobs()
+
+    def queue_length(self) -> int:
+        return len(self.queue)
+
+    def select_node(self, job: Job) -> Optional[Node]:
+        """
+        The node a job starts on, or None if it does not fit.
+        """
+        return self.cluster.find_node(job)
+
+    def schedule(self, env: simpy.Environment, metrics: MetricCollector):
+        started = []
+        failed_shapes = []
+
+        def start(job: Job) -> bool:
+            node = self.find_fit(job, failed_shapes, self.select_node)
+            if node is None:
+                return False
+            self.start_job(env, job, node, metrics)
+            started.append((job, node))
+            return True
+
+        new_only = not self.rescan
+        self.rescan = False
+        self.queue.offer(start, lambda job: self.find_fit(job, failed_shapes) is not None, new_only)
 
-    def schedule(self, env: simpy.Environment, job: Job, metrics: MetricCollector):
-        yield env.timeout(job.submit_time - env.now)
-        logger.info(f"[{env.now}] Job {job.name} submitted")
-        metrics.record_job_submission(job, env)
-
-        while True:
-            for node in self.cluster.nodes:
-                if (node.gpus_available >= job.gpus and
-                    node.cpus_available >= job.cpus and
-                    node.memory_available >= job.memory):
-
-                    # Record waiting time
-                    job.waiting_time = env.now - job.submit_time
-                    
-                    metrics.record_job_start(job, env)
-                    metrics.record_utilization(env, self.cluster)
-
-
-                    node.gpus_available -= job.gpus
-                    node.cpus_available -= job.cpus 
-                    node.memory_available -= job.memory
-                    logger.info(f"[{env.now}] Job {job.name} scheduled on node {node.name}")
-
-                    yield env.timeout(job.duration)
-
-                    node.gpus_available += job.gpus
-                    node.cpus_available += job.cpus
-                    node.memory_available += job.memory
-                    logger.info(f"[{env.now}] Job {job.name} completed on node {node.name}")
-                    
-                    metrics.record_job_end(job, env)
-                    metrics.record_utilization(env, self.cluster)
-                    metrics.record_energy(node)
-
-                    return
-            
-            
-            yield env.timeout(1)  # Wait for 1 time unit before checking again
-            metrics.record_utilization(env, self.cluster)
-            logger.info(f"[{env.now}] No available resources for job {job.name}, waiting...")
\ No newline at end of file
+        if len(self.queue) and self.tracer is not None:
+            self.tracer.emit(TraceEvent.WAIT, env.now, self.queue.head())
+        return started
@@ -0,0 +1,168 @@
+import json
+import struct
+from enum import IntEnum
+from typing import Iterator, NamedTuple, Optional
+
+from aischedlab.core.models import Job, Node
+
+class TraceEvent(IntEnum):
+    SUBMIT = 0  # Job submitted to the scheduler
+    START = 1  # Job started on a node
+    FINISH = 2  # Job completed and released its node
+    WAIT = 3  # Scheduling pass ended with the job at the head of the queue still waiting
+    RESERVE = 4  # Backfill reservation made for the job on a node
+    BACKFILL = 5  # Job started ahead of the reserved head job
+    WAKE = 6  # Node woken for queued jobs (no job)
+    SUSPEND = 7  # Idle node put to sleep (no job)
+
+class TraceLevel(IntEnum):
+    OFF = 0
+    JOBS = 1  # Job lifecycle: submit, start, finish
+    DECISIONS = 2  # Lifecycle plus scheduler decisions: waits, reservations, backfills, power changes
+
+EVENT_LEVELS = {
+    TraceEvent.SUBMIT: TraceLevel.JOBS,
+    TraceEvent.START: TraceLevel.JOBS,
+    TraceEvent.FINISH: TraceLevel.JOBS,
+    TraceEvent.WAIT: TraceLevel.DECISIONS,
+    TraceEvent.RESERVE: TraceLevel.DECISIONS,
+    TraceEvent.BACKFILL: TraceLevel.DECISIONS,
+    TraceEvent.WAKE: TraceLevel.DECISIONS,
+    TraceEvent.SUSPEND: TraceLevel.DECISIONS,
+}
+
+# Binary layout: a magic header, then records that each start with a one-byte type.
+# Events are (type, time, job id, node id); ids are defined once by a name record before first use.
+MAGIC = b"AISLTRC1"
+_EVENT = struct.Struct("<Bdii")
+_NAME = struct.Struct("<BiH")
+_DEFINE_JOB = 254
+_DEFINE_NODE = 255
+_NONE = -1
+
+class TraceRecord(NamedTuple):
+    time: float
+    event: TraceEvent
+    job: Optional[str]
+    node: Optional[str]
+
+class Tracer:
+    """
+    Buffered structured trace of simulation events.
+
+    Records are written as compact binary records, or as newline-delimited JSON if the path ends
+    in ``.ndjson`` or ``.jsonl``. Events above the configured level return before anything is
+    formatted. Job ids are released when a job finishes, so the name table only holds live jobs.
+    """
+
+    def __init__(self, path: str, level: TraceLevel = TraceLevel.JOBS, buffer_size: int = 1 << 20):
+        """
+        :param path: Output file of the trace.
+        :param level: Most detailed level to record.
+        :param buffer_size: Size of the write buffer in bytes.
+        """
+        self.path = path
+        self.level = TraceLevel(level)
+        self.ndjson = path.endswith((".ndjson", ".jsonl"))
+        self.records = 0
+        self._job_ids = {}
+        self._node_ids = {}
+        self._next_job_id = 0
+        if self.ndjson:
+            self._file = open(path, "w", buffering=buffer_size)
+        else:
+            self._file = open(path, "wb", buffering=buffer_size)
+            self._file.write(MAGIC)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def emit(self, event: TraceEvent, time: float, job: Optional[Job] = None, node: Optional[Node] = None):
+        if EVENT_LEVELS[event] > self.level:
+            return
+        self.records += 1
+        if self.ndjson:
+            self._file.write(json.dumps({
+                "time": float(time),
+                "event": event.name.lower(),
+                "job": job.name if job is not None else None,
+                "node": node.name if node is not None else None,
+            }) + "\n")
+            return
+        job_id = self._job_id(job) if job is not None else _NONE
+        node_id = self._node_id(node) if node is not None else _NONE
+        self._file.write(_EVENT.pack(event, time, job_id, node_id))
+        if event is TraceEvent.FINISH:
+            # A finished job is never referenced again
+            del self._job_ids[job.name]
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def _job_id(self, job: Job) -> int:
+        job_id = self._job_ids.get(job.name)
+        if job_id is None:
+            job_id = self._job_ids[job.name] = self._next_job_id
+            self._next_job_id += 1
+            self._define(_DEFINE_JOB, job_id, job.name)
+        return job_id
+
+    def _node_id(self, node: Node) -> int:
+        node_id = self._node_ids.get(node.name)
+        if node_id is None:
+            node_id = self._node_ids[node.name] = len(self._node_ids)
+            self._define(_DEFINE_NODE, node_id, node.name)
+        return node_id
+
+    def _define(self, kind: int, ident: int, name: str):
+        encoded = name.encode("utf-8")
+        self._file.write(_NAME.pack(kind, ident, len(encoded)))
+        self._file.write(encoded)
+
+def read_trace(path: str) -> Iterator[TraceRecord]:
+    """
+    Read a binary or NDJSON trace written by :class:`Tracer`.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            f.seek(0)
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield TraceRecord(record["time"], TraceEvent[record["event"].upper()],
+                                      record["job"], record["node"])
+            return
+
+        names = {_DEFINE_JOB: {}, _DEFINE_NODE: {}}
+        while True:
+            kind = f.read(1)
+            if not kind:
+                return
+            if kind[0] in names:
+                _, ident, length = _NAME.unpack(kind + f.read(_NAME.size - 1))
+                names[kind[0]][ident] = f.read(length).decode("utf-8")
+                continue
+            event, time, job_id, node_id = _EVENT.unpack(kind + f.read(_EVENT.size - 1))
+            yield TraceRecord(time, TraceEvent(event),
+                              names[_DEFINE_JOB].get(job_id) if job_id != _NONE else None,
+                              names[_DEFINE_NODE].get(node_id) if node_id != _NONE else None)
+
+def format_record(record: TraceRecord) -> str:
+    """
+    Human-readable line for a trace record, in the style of the simulator's log.
+    """
+    messages = {
+        TraceEvent.SUBMIT: "Job {job} submitted",
+        TraceEvent.START: "Job {job} scheduled on node {node}",
+        TraceEvent.FINISH: "Job {job} completed on node {node}",
+        TraceEvent.WAIT: "No available resources for job {job}, waiting...",
+        TraceEvent.RESERVE: "Job {job} reserved on node {node}",
+        TraceEvent.BACKFILL: "Job {job} backfilled on node {node}",
+        TraceEvent.WAKE: "Waking node {node}",
+        TraceEvent.SUSPEND: "Suspending idle node {node}",
+    }
+    return f"[{record.time}] " + messages[record.event].format(job=record.job, node=record.node)
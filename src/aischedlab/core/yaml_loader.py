@@ -1,48 +1,158 @@
+import csv
+import gzip
+import json
+import math
 import re
+from typing import Iterable, Iterator
 import yaml
-from aischedlab.core.models import Cluster, Job, Node
+import numpy as np
+from aischedlab.core.models import ArrayCluster, Cluster, Job, Node, NODE_COLUMNS
 import logging
 
 logger = logging.getLogger(__name__)
 
-def expand_nodes(node_def):
-    # Expand pattern if present
+def expand_node_names(node_def) -> tuple[list[str], dict]:
+    """
+    Split a node definition into the node names it describes and the fields they share.
+
+    ``name_pattern: node_[0-9]`` expands the numeric range; ``name: gpu`` with ``count: 3``
+    expands to ``gpu_0`` .. ``gpu_2``. Missing ``*_available`` fields default to the totals.
+    """
+    fields = {key: value for key, value in node_def.items() if key not in ("name", "name_pattern", "count")}
+    for resource in ("gpus", "cpus", "memory"):
+        if f"{resource}_total" in fields:
+            fields.setdefault(f"{resource}_available", fields[f"{resource}_total"])
     if "name_pattern" in node_def:
         pattern = node_def["name_pattern"]
         match = re.search(r"\[(\d+)-(\d+)\]", pattern)
-        if match:
-            start, end = int(match.group(1)), int(match.group(2))
-            nodes = []
-            for i in range(start, end + 1):
-                node = node_def.copy()
-                node["name"] = pattern.replace(match.group(0), str(i))
-                node.pop("name_pattern", None)
-                node.pop("count", None)
-                nodes.append(node)
-            return nodes
-        else:
-            # If pattern is present but not matched, remove it
-            node = node_def.copy()
-            node.pop("name_pattern", None)
-            node.pop("count", None)
-            return [node]
-    # Remove count if present
-    node = node_def.copy()
-    node.pop("count", None)
-    return [node]
+        if not match:
+            # If pattern is present but not matched, use it as the name
+            return [pattern], fields
+        prefix, suffix = pattern[:match.start()], pattern[match.end():]
+        start, end = int(match.group(1)), int(match.group(2))
+        return [f"{prefix}{i}{suffix}" for i in range(start, end + 1)], fields
+    if "count" in node_def:
+        return [f"{node_def['name']}_{i}" for i in range(node_def["count"])], fields
+    return [node_def["name"]], fields
+
+def expand_nodes(node_def):
+    names, fields = expand_node_names(node_def)
+    return [dict(fields, name=name) for name in names]
 
 def load_jobs(path: str) -> list[Job]:
     with open(path, 'r') as file:
         data = yaml.safe_load(file)
     return [Job(**item) for item in data]
 
-def load_cluster(path: str) -> Cluster:
+def _open_text(path: str):
+    # Transparently decompress gzip traces
+    if path.endswith(".gz"):
+        return gzip.open(path, 'rt', newline='')
+    return open(path, 'r', newline='')
+
+def _number(value: str):
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+def _in_submit_order(jobs: Iterable[Job], path: str) -> Iterator[Job]:
+    last_submit = -math.inf
+    for job in jobs:
+        if job.submit_time < last_submit:
+            raise ValueError(f"Trace {path} is not sorted by submit_time (job {job.name})")
+        last_submit = job.submit_time
+        yield job
+
+def iter_jobs_csv(path: str) -> Iterator[Job]:
+    """
+    Stream jobs from a CSV file with a header row using the Job field names.
+    """
+    with _open_text(path) as file:
+        for row in csv.DictReader(file):
+            fields = {key: value for key, value in row.items() if value not in (None, '')}
+            name = fields.pop("name")
+            yield Job(name=name, **{key: _number(value) for key, value in fields.items()})
+
+def iter_jobs_jsonl(path: str) -> Iterator[Job]:
+    """
+    Stream jobs from a JSON Lines file, one job object per line.
+    """
+    with _open_text(path) as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield Job(**json.loads(line))
+
+def iter_jobs_swf(path: str) -> Iterator[Job]:
+    """
+    Stream jobs from a Standard Workload Format (SWF) trace.
+
+    Processors are mapped to CPUs and requested memory (KB per processor) to GB; SWF has no GPU
+    field, so jobs request no GPUs. Jobs without a positive run time or processor count
+    (e.g. cancelled jobs) are skipped.
+    """
+    skipped = 0
+    with _open_text(path) as file:
+        for line in file:
+            if not line.strip() or line.lstrip().startswith(';'):
+                continue
+            fields = line.split()
+            run_time = _number(fields[3])
+            processors = int(fields[7]) if int(fields[7]) > 0 else int(fields[4])
+            if run_time <= 0 or processors <= 0:
+                skipped += 1
+                continue
+            memory_kb = _number(fields[9]) if _number(fields[9]) > 0 else _number(fields[6])
+            memory = math.ceil(memory_kb * processors / 1024 ** 2) if memory_kb > 0 else 0
+            yield Job(name=fields[0], submit_time=_number(fields[1]), duration=run_time,
+                      gpus=0, cpus=processors, memory=memory)
+    if skipped:
+        logger.info(f"Skipped {skipped} SWF record(s) without run time or processors in {path}")
+
+def iter_jobs(path: str) -> Iterator[Job]:
+    """
+    Stream jobs in submit order from a trace file, chosen by extension.
+
+    Supports ``.csv``, ``.jsonl``/``.ndjson`` and ``.swf`` (each optionally ``.gz`` compressed),
+    which must already be sorted by submit time, and ``.yaml``/``.yml``, which is loaded and sorted.
+    """
+    suffix = path[:-3] if path.endswith(".gz") else path
+    suffix = suffix.rsplit('.', 1)[-1].lower()
+    if suffix in ("yaml", "yml"):
+        return iter(sorted(load_jobs(path), key=lambda j: j.submit_time))
+    if suffix == "csv":
+        return _in_submit_order(iter_jobs_csv(path), path)
+    if suffix in ("jsonl", "ndjson"):
+        return _in_submit_order(iter_jobs_jsonl(path), path)
+    if suffix == "swf":
+        return _in_submit_order(iter_jobs_swf(path), path)
+    raise ValueError(f"Unsupported job trace format: {path}")
+
+def load_cluster(path: str, compact: bool = False) -> Cluster:
+    """
+    Load a cluster definition.
+
+    :param compact: Build an ArrayCluster, writing every node definition straight into the
+                    column arrays instead of creating one Node object per node.
+    """
     with open(path, 'r') as file:
         data = yaml.safe_load(file)
-    nodes = []
-    for node_def in data["nodes"]:
-        nodes.extend(expand_nodes(node_def))
+    groups = [expand_node_names(node_def) for node_def in data["nodes"]]
+    if compact:
+        names = [name for group_names, _ in groups for name in group_names]
+        columns = {}
+        for column, dtype in NODE_COLUMNS.items():
+            parts = []
+            for group_names, fields in groups:
+                # Fields left out fall back to the Node defaults (power figures, energy counters)
+                value = fields[column] if column in fields else getattr(Node, column, None)
+                if value is None:
+                    raise ValueError(f"Node definition {group_names[0]} is missing '{column}'")
+                parts.append(np.full(len(group_names), value, dtype=dtype))
+            columns[column] = np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+        return ArrayCluster(names, **columns)
     # Create Node objects
-    node_objs = [Node(**node) for node in nodes]
+    node_objs = [Node(name=name, **fields) for names, fields in groups for name in names]
     # Create and return Cluster object
-    return Cluster(nodes=node_objs)
\ No newline at end of file
+    return Cluster(nodes=node_objs)
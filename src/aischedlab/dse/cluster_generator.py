@@ -1,38 +1,72 @@
-from aischedlab.core.models import Cluster, Node
-import random
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from aischedlab.core.models import ArrayCluster, Cluster, Node
+
+@dataclass
+class NodeTemplate:
+    """
+    A group of identical nodes, named ``{name}_0`` .. ``{name}_{count - 1}``.
+    """
+    name: str
+    count: int
+    gpus: int
+    cpus: int
+    memory: int # in GB
+    power_idle: float = 100.0 # Watts in idle state
+    power_active: float = 300.0 # Watts in active state
 
 class ClusterGenerator:
-    def __init__(self, nodes: list[Node]):
+    def __init__(self, templates: list[NodeTemplate]):
         """
-        Initialize the ClusterGenerator with the number of nodes and their capacity.
+        Initialize the ClusterGenerator with the node templates of a heterogeneous fleet.
 
-        :param nodes: List of Node objects in the cluster.
+        :param templates: Node templates with counts, e.g. 5000 A100-class and 2000 CPU-only nodes.
         """
-        self.nodes = nodes
+        self.templates = templates
 
-    def generate_nodes(self, gpu_range: tuple[int, int], cpu_range: tuple[int, int], memory_range: tuple[int, int], node_ram_range: tuple[int, int]) -> list[Node]:
-        """
-        Generate a list of Node objects with the specified configuration.
-        
-        :return: A list of Node objects.
-        """
-        nodes = []
-
-        for i in range(len(self.nodes)):
-            node = self.nodes[i]
-            node.gpu = random.randint(*gpu_range)
-            node.cpu = random.randint(*cpu_range)
-            node.memory = random.randint(*memory_range)
-            node.ram = random.randint(*node_ram_range)
-            nodes.append(node)
-        
-        return nodes
-
-    def generate(self) -> Cluster:
+    def generate(self, compact: bool = True) -> Cluster:
         """
-        Generate a Cluster object with the specified number of nodes and their capacity.
-        
-        :return: A Cluster object with the defined configuration.
+        Generate a new cluster from the templates.
+
+        :param compact: Return an ArrayCluster whose columns are built with one np.repeat per field;
+                        otherwise a Cluster of Node objects.
+        :return: A fully available cluster.
         """
-        return Cluster(nodes=self.nodes)
-        
\ No newline at end of file
+        counts = [template.count for template in self.templates]
+        names = [f"{template.name}_{i}" for template in self.templates for i in range(template.count)]
+        gpus = np.repeat([template.gpus for template in self.templates], counts)
+        cpus = np.repeat([template.cpus for template in self.templates], counts)
+        memory = np.repeat([template.memory for template in self.templates], counts)
+        power_idle = np.repeat([float(template.power_idle) for template in self.templates], counts)
+        power_active = np.repeat([float(template.power_active) for template in self.templates], counts)
+        return _build_cluster(names, gpus, cpus, memory, power_idle, power_active, compact)
+
+def random_cluster(num_nodes: int, gpu_range: tuple[int, int], cpu_range: tuple[int, int], memory_range: tuple[int, int],
+                   seed: Optional[int] = None, power_idle: float = 100.0, power_active: float = 300.0,
+                   compact: bool = True) -> Cluster:
+    """
+    Generate a cluster of nodes with resources drawn uniformly from inclusive ranges.
+
+    :param seed: Seed of the NumPy generator, for reproducible clusters.
+    """
+    rng = np.random.default_rng(seed)
+    names = [f"node_{i}" for i in range(num_nodes)]
+    gpus = rng.integers(gpu_range[0], gpu_range[1] + 1, num_nodes)
+    cpus = rng.integers(cpu_range[0], cpu_range[1] + 1, num_nodes)
+    memory = rng.integers(memory_range[0], memory_range[1] + 1, num_nodes)
+    return _build_cluster(names, gpus, cpus, memory,
+                          np.full(num_nodes, power_idle), np.full(num_nodes, power_active), compact)
+
+def _build_cluster(names, gpus, cpus, memory, power_idle, power_active, compact: bool) -> Cluster:
+    if compact:
+        return ArrayCluster(names, gpus_total=gpus, cpus_total=cpus, memory_total=memory,
+                            power_idle=power_idle, power_active=power_active)
+    nodes = [Node(name=name, gpus_total=g, cpus_total=c, memory_total=m,
+                  gpus_available=g, cpus_available=c, memory_available=m,
+                  power_idle=idle, power_active=active)
+             for name, g, c, m, idle, active in zip(names, gpus.tolist(), cpus.tolist(), memory.tolist(),
+                                                    power_idle.tolist(), power_active.tolist())]
+    return Cluster(nodes=nodes)
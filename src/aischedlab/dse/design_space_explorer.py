@@ -1,15 +1,46 @@
+import copy
+import csv
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Union
+
 from aischedlab.core.models import Cluster, Node, Job
 from aischedlab.dse.job_generator import JobGenerator
+from aischedlab.dse.objectives import Objective, complete_runs_only, get_objective
 from aischedlab.core.simengine import SimulationEngine
 from aischedlab.core.base_scheduler import BaseScheduler
+from aischedlab.dse.result_cache import ResultCache, cache_key, digest_cluster, digest_jobs
+
+def simulate_point(cluster: Cluster, jobs: list[Job], scheduler_cls: type, engine: str = "simpy") -> dict:
+    """
+    Simulate one point of the design space on private copies of the cluster and jobs.
+
+    Runs in a worker process, so it must stay a module-level function.
+    """
+    sim_engine = SimulationEngine(
+        cluster=copy.deepcopy(cluster),
+        jobs=copy.deepcopy(jobs),
+        scheduler_cls=scheduler_cls,
+        engine=engine
+    )
+    sim_engine.run(report=False)
+    return sim_engine.results()
 
 class DesignSpaceExplorer:
-    def __init__(self, clusters: list[Cluster], jobs: list[Job] = None, schedulers: list = None):
+    def __init__(self, clusters: list[Cluster], jobs: list[Job] = None, schedulers: list = None, engine: str = "simpy",
+                 cache: ResultCache = None):
         """
         Initialize the DesignSpaceExplorer with clusters, jobs, and schedulers.
+
+        :param engine: Simulation engine used for every run, see SimulationEngine.
+        :param cache: Optional result cache; points already in it are not simulated again.
         """
         self.clusters = clusters
         self.schedulers = schedulers
+        self.engine = engine
+        self.cache = cache
+        self.results = []
 
         if jobs:
             self.jobs = jobs
@@ -20,26 +51,176 @@ class DesignSpaceExplorer:
                 duration_range=(5, 20),
                 gpu_range=(1, 4),
                 cpu_range=(1, 8),
-                memory_range=(1024, 8192)
+                memory_range=(1, 64)
             )
             self.jobs = job_gen.generate_jobs()
 
-    def explore(self):
-        # Placeholder for exploration logic
+    def explore(self, workers: int = None) -> list[dict]:
+        """
+        Simulate every (cluster, scheduler) pair, each in isolation.
+
+        :param workers: Number of worker processes. None uses one per CPU; 1 runs serially in this process.
+        :return: One comparison row per pair, also kept in ``self.results``.
+        """
         print("Exploring design space...")
-        for cluster in self.clusters:
-            for scheduler in self.schedulers:
-                print(f"Running simulation for cluster {cluster} with scheduler {scheduler.__name__}")
-                self.run_simulation(cluster, scheduler)
-            
+        points = [(index, cluster, scheduler)
+                  for index, cluster in enumerate(self.clusters)
+                  for scheduler in self.schedulers]
+        runs = self._run_points(points, self.jobs, workers)
+
+        self.results = []
+        for (index, cluster, scheduler), run in zip(points, runs):
+            row = {
+                "cluster": f"cluster_{index}",
+                "num_nodes": len(cluster.nodes),
+                "scheduler": scheduler.__name__,
+            }
+            row.update(run["summary"])
+            self.results.append(row)
+            print(f"Finished simulation for cluster_{index} with scheduler {scheduler.__name__}")
+        return self.results
+
+    def search(self, objective: Union[str, Objective] = "p95_wait", eta: int = 3, min_fraction: float = 0.05,
+               workers: int = None) -> list[dict]:
+        """
+        Find the best (cluster, scheduler) pairs by successive halving instead of simulating every pair in full.
+
+        All pairs are first simulated on a prefix of the trace (the earliest submitted jobs). Each round keeps
+        the best ``1 / eta`` of them by the objective, and the survivors are simulated on a prefix ``eta`` times
+        longer, until the last round runs the survivors on the full trace. Pairs tied with the last survivor
+        are kept too. Runs that leave submitted jobs unplaced score infinity, so clusters that cannot host
+        the trace lose to every cluster that can. With N pairs this costs about ``log_eta(N)`` full simulations' worth of work per
+        survivor instead of N full simulations.
+
+        :param objective: Score to minimize: a name from ``OBJECTIVES`` (e.g. ``"p95_wait"``, ``"kwh_per_job"``),
+                          a key of the results summary or a callable taking the results of SimulationEngine.results().
+        :param eta: Reduction factor between rounds.
+        :param min_fraction: Smallest share of the trace the first round simulates.
+        :param workers: Number of worker processes. None uses one per CPU; 1 runs serially in this process.
+        :return: Full-trace results of the survivors, best first, also kept in ``self.results``.
+                 Every evaluation of every round is kept in ``self.search_history``.
+        """
+        if eta < 2:
+            raise ValueError("eta must be at least 2")
+        score = complete_runs_only(get_objective(objective))
+        jobs = sorted(self.jobs, key=lambda j: j.submit_time)
+        candidates = [(index, cluster, scheduler)
+                      for index, cluster in enumerate(self.clusters)
+                      for scheduler in self.schedulers]
+        # Budgets grow by eta per round and end at the full trace, as in successive halving
+        rounds = math.floor(math.log(len(candidates), eta) + 1e-9) if candidates else 0
+        fraction = max(min_fraction, eta ** -rounds)
+        print(f"Searching {len(candidates)} design points by {getattr(score, '__name__', 'objective')}...")
+
+        self.search_history = []
+        round_index = 0
+        while candidates:
+            size = len(jobs) if fraction >= 1 else max(1, math.ceil(len(jobs) * fraction))
+            runs = self._run_points(candidates, jobs[:size], workers)
+            scored = sorted(zip((score(run) for run in runs), range(len(candidates))))
+            final = size == len(jobs)
+            keep = len(candidates) if final else math.ceil(len(candidates) / eta)
+            cutoff = scored[keep - 1][0]
+            kept = {position for value, position in scored if value <= cutoff}
+            for value, position in scored:
+                index, cluster, scheduler = candidates[position]
+                self.search_history.append({
+                    "round": round_index,
+                    "jobs": size,
+                    "cluster": f"cluster_{index}",
+                    "scheduler": scheduler.__name__,
+                    "objective": value,
+                    "kept": position in kept,
+                })
+            print(f"Round {round_index}: {len(candidates)} point(s) on {size} job(s), keeping {len(kept)}")
+            if final:
+                self.results = []
+                for value, position in scored:
+                    index, cluster, scheduler = candidates[position]
+                    row = {
+                        "cluster": f"cluster_{index}",
+                        "num_nodes": len(cluster.nodes),
+                        "scheduler": scheduler.__name__,
+                        "objective": value,
+                    }
+                    row.update(runs[position]["summary"])
+                    self.results.append(row)
+                return self.results
+            candidates = [candidates[position] for position in sorted(kept)]
+            fraction = min(1.0, fraction * eta)
+            round_index += 1
+        self.results = []
+        return self.results
+
+    def _run_points(self, points: list[tuple], jobs: list[Job], workers: int = None) -> list[dict]:
+        # Results of (cluster index, cluster, scheduler) points on a trace, from the cache or simulated
+        runs = [None] * len(points)
+        keys = [None] * len(points)
+        if self.cache is not None:
+            jobs_digest = digest_jobs(jobs)
+            cluster_digests = {}
+            for i, (index, cluster, scheduler) in enumerate(points):
+                if index not in cluster_digests:
+                    cluster_digests[index] = digest_cluster(cluster)
+                keys[i] = cache_key(cluster_digests[index], jobs_digest, scheduler, self._settings())
+                runs[i] = self.cache.get(keys[i])
+        missing = [i for i, run in enumerate(runs) if run is None]
+        if len(missing) < len(points):
+            print(f"Reusing {len(points) - len(missing)} cached result(s)")
+
+        if workers == 1:
+            for i in missing:
+                _, cluster, scheduler = points[i]
+                runs[i] = simulate_point(cluster, jobs, scheduler, self.engine)
+        elif missing:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {i: pool.submit(simulate_point, points[i][1], jobs, points[i][2], self.engine)
+                           for i in missing}
+                for i, future in futures.items():
+                    runs[i] = future.result()
+        if self.cache is not None:
+            for i in missing:
+                self.cache.put(keys[i], runs[i])
+        return runs
+
+    def _settings(self) -> dict:
+        # Engine settings that influence results and therefore belong in the cache key
+        return {"engine": self.engine}
+
+    def write_results(self, path: str):
+        """
+        Write the comparison table of the last explore() call as CSV.
+        """
+        if not self.results:
+            raise ValueError("No results to write, call explore() first")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(self.results[0]))
+            writer.writeheader()
+            writer.writerows(self.results)
+
     def run_simulation(self, cluster: Cluster, scheduler_cls: BaseScheduler):
         """
         Run a simulation with the given cluster and scheduler class.
+
+        The cluster and jobs are copied, so the explorer's inputs are never modified.
+        Cached results are returned without simulating or printing a summary.
         """
+        if self.cache is not None:
+            key = cache_key(digest_cluster(cluster), digest_jobs(self.jobs), scheduler_cls, self._settings())
+            results = self.cache.get(key)
+            if results is not None:
+                return results
+
         sim_engine = SimulationEngine(
-            cluster=cluster,
-            jobs=self.jobs,
-            scheduler_cls=scheduler_cls
+            cluster=copy.deepcopy(cluster),
+            jobs=copy.deepcopy(self.jobs),
+            scheduler_cls=scheduler_cls,
+            engine=self.engine
         )
         sim_engine.run()
         sim_engine.print_summary()
+        results = sim_engine.results()
+        if self.cache is not None:
+            self.cache.put(key, results)
+        return results
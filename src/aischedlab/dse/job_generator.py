@@ -1,27 +1,152 @@
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+
 from aischedlab.core.models import Job
-import random
+
+ARRIVAL_PROCESSES = ("uniform", "poisson", "diurnal")
+DURATION_DISTRIBUTIONS = ("uniform", "lognormal", "pareto")
+JOB_COLUMNS = ("submit_time", "duration", "gpus", "cpus", "memory")
 
 class JobGenerator:
-    def __init__(self, num_jobs_range: tuple[int, int], submit_time_range: tuple[int, int], duration_range: tuple[int, int], gpu_range: tuple[int, int], cpu_range: tuple[int, int], memory_range: tuple[int, int]):
+    # Jobs are drawn in chunks of this size on every path, so a seed yields the same trace
+    # whether it is generated as arrays or as an iterator
+    chunk_size = 65536
+
+    def __init__(self, num_jobs_range: tuple[int, int], submit_time_range: tuple[int, int], duration_range: tuple[int, int],
+                 gpu_range: tuple[int, int], cpu_range: tuple[int, int], memory_range: tuple[int, int],
+                 seed: Optional[int] = None, arrival: str = "uniform", arrival_rate: Optional[float] = None,
+                 diurnal_amplitude: float = 0.5, diurnal_period: float = 86400,
+                 duration_distribution: str = "uniform", duration_shape: Optional[float] = None,
+                 gpu_choices: Optional[Sequence[int]] = None, gpu_weights: Optional[Sequence[float]] = None):
+        """
+        Synthesize job traces with a seeded NumPy generator.
+
+        :param num_jobs_range: Inclusive range the number of jobs is drawn from.
+        :param submit_time_range: Time window of the uniform arrivals and start time of the Poisson/diurnal processes.
+        :param duration_range: Inclusive duration bounds; heavy-tailed durations are clipped to the upper bound.
+        :param gpu_range: Inclusive GPU count range, used when no gpu_choices are given.
+        :param cpu_range: Inclusive CPU count range.
+        :param memory_range: Inclusive memory range in GB.
+        :param seed: Seed of the NumPy generator. Each generate/iterate call restarts from it, so a seed always
+                     reproduces the same trace; None draws fresh entropy per call.
+        :param arrival: "uniform" (sorted uniform times in submit_time_range), "poisson" or "diurnal"
+                        (Poisson with a sinusoidal daily rate).
+        :param arrival_rate: Mean arrivals per time unit for poisson/diurnal; defaults to filling submit_time_range.
+        :param diurnal_amplitude: Relative swing of the diurnal rate, between 0 and 1.
+        :param diurnal_period: Period of the diurnal rate in time units.
+        :param duration_distribution: "uniform", "lognormal" (median at the geometric mean of duration_range)
+                                      or "pareto" (starting at the lower bound).
+        :param duration_shape: Sigma of the lognormal (default 1.0) or tail index of the Pareto (default 1.5).
+        :param gpu_choices: GPU counts to draw from, e.g. (1, 2, 4, 8).
+        :param gpu_weights: Relative frequency of each gpu_choices entry; uniform if omitted.
+        """
+        if arrival not in ARRIVAL_PROCESSES:
+            raise ValueError(f"Unknown arrival process '{arrival}', expected one of {ARRIVAL_PROCESSES}")
+        if duration_distribution not in DURATION_DISTRIBUTIONS:
+            raise ValueError(f"Unknown duration distribution '{duration_distribution}', expected one of {DURATION_DISTRIBUTIONS}")
         self.num_jobs_range = num_jobs_range
         self.submit_time_range = submit_time_range
         self.duration_range = duration_range
         self.gpu_range = gpu_range
         self.cpu_range = cpu_range
         self.memory_range = memory_range
+        self.seed = seed
+        self.arrival = arrival
+        self.arrival_rate = arrival_rate
+        self.diurnal_amplitude = diurnal_amplitude
+        self.diurnal_period = diurnal_period
+        self.duration_distribution = duration_distribution
+        self.duration_shape = duration_shape
+        self.gpu_choices = np.asarray(gpu_choices) if gpu_choices is not None else None
+        if gpu_weights is not None:
+            gpu_weights = np.asarray(gpu_weights, dtype=float)
+            gpu_weights = gpu_weights / gpu_weights.sum()
+        self.gpu_weights = gpu_weights
+
+    def generate_arrays(self, num_jobs: Optional[int] = None) -> dict[str, np.ndarray]:
+        """
+        Draw a whole trace as columnar arrays sorted by submit time.
+
+        :param num_jobs: Number of jobs; drawn from num_jobs_range if omitted.
+        :return: One array per column in JOB_COLUMNS.
+        """
+        chunks = list(self._chunks(num_jobs))
+        if not chunks:
+            return {column: np.empty(0) for column in JOB_COLUMNS}
+        return {column: np.concatenate([chunk[column] for chunk in chunks]) for column in JOB_COLUMNS}
+
+    def iter_jobs(self, num_jobs: Optional[int] = None) -> Iterator[Job]:
+        """
+        Lazily yield Job objects in submit order, holding at most one chunk of jobs in memory.
+        """
+        index = 0
+        for chunk in self._chunks(num_jobs):
+            for submit_time, duration, gpus, cpus, memory in zip(*(chunk[column].tolist() for column in JOB_COLUMNS)):
+                yield Job(name=f"job_{index}", submit_time=submit_time, duration=duration,
+                          gpus=gpus, cpus=cpus, memory=memory)
+                index += 1
+
+    def generate_jobs(self, num_jobs: Optional[int] = None) -> list[Job]:
+        return list(self.iter_jobs(num_jobs))
+
+    def _chunks(self, num_jobs: Optional[int]) -> Iterator[dict[str, np.ndarray]]:
+        rng = np.random.default_rng(self.seed)
+        if num_jobs is None:
+            num_jobs = int(rng.integers(self.num_jobs_range[0], self.num_jobs_range[1] + 1))
+
+        start, end = self.submit_time_range
+        if self.arrival == "uniform":
+            # Order statistics need the whole window at once; this is the only full-length array
+            all_submit_times = np.sort(rng.uniform(start, end, num_jobs))
+        rate = self.arrival_rate or (num_jobs / (end - start) if end > start else 1.0)
+
+        last_time = float(start)
+        for offset in range(0, num_jobs, self.chunk_size):
+            size = min(self.chunk_size, num_jobs - offset)
+            if self.arrival == "uniform":
+                submit_times = all_submit_times[offset:offset + size]
+            elif self.arrival == "poisson":
+                submit_times = last_time + np.cumsum(rng.exponential(1 / rate, size))
+            else:
+                submit_times = self._diurnal_arrivals(rng, size, last_time, rate)
+            if size:
+                last_time = float(submit_times[-1])
+            yield {
+                "submit_time": submit_times,
+                "duration": self._durations(rng, size),
+                "gpus": self._gpus(rng, size),
+                "cpus": rng.integers(self.cpu_range[0], self.cpu_range[1] + 1, size),
+                "memory": rng.integers(self.memory_range[0], self.memory_range[1] + 1, size),
+            }
+
+    def _diurnal_arrivals(self, rng: np.random.Generator, size: int, last_time: float, rate: float) -> np.ndarray:
+        # Thinning: draw candidates at the peak rate and keep each with probability rate(t) / peak rate
+        peak_rate = rate * (1 + self.diurnal_amplitude)
+        accepted = []
+        count = 0
+        while count < size:
+            candidates = last_time + np.cumsum(rng.exponential(1 / peak_rate, 2 * (size - count) + 16))
+            last_time = float(candidates[-1])
+            relative_rate = (1 + self.diurnal_amplitude * np.sin(2 * np.pi * candidates / self.diurnal_period)) / (1 + self.diurnal_amplitude)
+            kept = candidates[rng.random(len(candidates)) < relative_rate]
+            accepted.append(kept)
+            count += len(kept)
+        return np.concatenate(accepted)[:size]
+
+    def _durations(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        low, high = self.duration_range
+        if self.duration_distribution == "uniform":
+            return rng.integers(low, high + 1, size)
+        if self.duration_distribution == "lognormal":
+            sigma = self.duration_shape if self.duration_shape is not None else 1.0
+            durations = rng.lognormal(np.log(np.sqrt(max(low, 1) * high)), sigma, size)
+        else:
+            alpha = self.duration_shape if self.duration_shape is not None else 1.5
+            durations = max(low, 1) * (1 + rng.pareto(alpha, size))
+        return np.clip(np.ceil(durations), max(low, 1), high).astype(np.int64)
 
-    def generate_jobs(self) -> list[Job]:
-        jobs = []
-        for _ in range(random.randint(*self.num_jobs_range)):  # Generate a random number of jobs
-            job = Job(
-                id=random.randint(1, 1000),
-                name=f"Job-{random.randint(1, 100)}",
-                resources={
-                    "gpu": random.randint(*self.gpu_range),
-                    "cpu": random.randint(*self.cpu_range),
-                    "memory": random.randint(*self.memory_range),
-                },
-                runtime=random.randint(*self.duration_range),
-            )
-            jobs.append(job)
-        return jobs
\ No newline at end of file
+    def _gpus(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        if self.gpu_choices is not None:
+            return rng.choice(self.gpu_choices, size, p=self.gpu_weights)
+        return rng.integers(self.gpu_range[0], self.gpu_range[1] + 1, size)
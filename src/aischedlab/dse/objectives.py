@@ -0,0 +1,62 @@
+import math
+from typing import Callable, Union
+
+from aischedlab.core.sketch import QuantileSketch
+
+# An objective maps the results of SimulationEngine.results() to a score, lower is better
+Objective = Callable[[dict], float]
+
+def summary_metric(name: str) -> Objective:
+    """
+    Objective that reads a value from the results summary, e.g. ``"makespan"`` or ``"energy_per_job_kWh"``.
+    """
+    def objective(results: dict) -> float:
+        return results["summary"][name]
+    objective.__name__ = name
+    return objective
+
+def distribution_quantile(distribution: str, q: float) -> Objective:
+    """
+    Objective that reads any quantile of a per-job distribution from its serialized sketch,
+    e.g. ``distribution_quantile("waiting_time", 0.95)``.
+    """
+    def objective(results: dict) -> float:
+        return QuantileSketch.from_dict(results["distributions"][distribution]).quantile(q)
+    objective.__name__ = f"{distribution}_p{q * 100:g}"
+    return objective
+
+# Objectives selectable by name
+OBJECTIVES = {
+    "p95_wait": distribution_quantile("waiting_time", 0.95),
+    "p99_wait": distribution_quantile("waiting_time", 0.99),
+    "avg_wait": summary_metric("avg_waiting_time"),
+    "p95_slowdown": distribution_quantile("bounded_slowdown", 0.95),
+    "makespan": summary_metric("makespan"),
+    "kwh_per_job": summary_metric("energy_per_job_kWh"),
+}
+
+def get_objective(objective: Union[str, Objective]) -> Objective:
+    """
+    Resolve an objective given as a name from ``OBJECTIVES``, a key of the results summary
+    (e.g. ``"waiting_time_p99"``) or a callable.
+    """
+    if callable(objective):
+        return objective
+    if objective in OBJECTIVES:
+        return OBJECTIVES[objective]
+    return summary_metric(objective)
+
+def complete_runs_only(objective: Objective) -> Objective:
+    """
+    Wrap an objective so runs that could not place every submitted job score infinity.
+
+    The built-in objectives only see the jobs that ran, so a configuration that cannot host most of the
+    trace would otherwise look best, e.g. with no waiting at all or little energy per completed job.
+    """
+    def wrapped(results: dict) -> float:
+        summary = results["summary"]
+        if summary["jobs_completed"] < summary["jobs_submitted"]:
+            return math.inf
+        return objective(results)
+    wrapped.__name__ = getattr(objective, "__name__", "objective")
+    return wrapped
@@ -0,0 +1,235 @@
+import copy
+import csv
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from statistics import NormalDist
+from typing import Union
+
+from aischedlab.core.models import Cluster
+from aischedlab.dse.design_space_explorer import simulate_point
+from aischedlab.dse.job_generator import JobGenerator
+from aischedlab.dse.objectives import Objective, get_objective
+
+class RunningStats:
+    """
+    Running mean and variance (Welford), updated one observation at a time.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else math.inf
+
+    def half_width(self, confidence: float = 0.95) -> float:
+        """
+        Half-width of the Student-t confidence interval of the mean; infinite below two observations.
+        """
+        if self.count < 2:
+            return math.inf
+        return t_quantile(0.5 + confidence / 2, self.count - 1) * math.sqrt(self.variance() / self.count)
+
+class ReplicationRunner:
+    def __init__(self, cluster: Cluster, generator: JobGenerator, schedulers: list, metrics: list[Union[str, Objective]] = None,
+                 ci_width: Union[float, dict] = 1.0, relative: bool = False, confidence: float = 0.95,
+                 min_replicas: int = 5, max_replicas: int = 100, base_seed: int = 0, engine: str = "fast"):
+        """
+        Compare schedulers over seeded replicas of a synthetic trace until the comparisons are precise enough.
+
+        Replica ``i`` draws its trace from ``generator`` with seed ``base_seed + i`` and runs every compared
+        scheduler on that same trace (common random numbers), so the per-replica differences between two
+        schedulers do not include the trace-to-trace noise. Every scheduler is compared with the first one,
+        the baseline, on every metric. A comparison stops once the confidence interval of its mean paired
+        difference is at most ``ci_width`` wide; schedulers whose comparisons have all stopped are no longer
+        simulated, and the run ends when every comparison has stopped or ``max_replicas`` is reached.
+
+        :param cluster: The cluster every replica runs on; copied for each run.
+        :param generator: Trace template; its seed is replaced per replica.
+        :param schedulers: Strategies to compare, the first one is the baseline.
+        :param metrics: Metrics to compare: names from ``OBJECTIVES``, keys of the results summary or callables
+                        taking SimulationEngine.results(). Defaults to the average and p99 waiting time.
+        :param ci_width: Target width of the confidence intervals, for all metrics or per metric name.
+        :param relative: Interpret ci_width as a fraction of the baseline's mean instead of in metric units.
+        :param confidence: Confidence level of the intervals.
+        :param min_replicas: Replicas before any comparison may stop, so early variance estimates cannot stop it.
+        :param max_replicas: Upper bound on the replicas of the whole run.
+        :param base_seed: Seed of the first replica.
+        :param engine: Simulation engine of every run, see SimulationEngine.
+        """
+        if len(schedulers) < 2:
+            raise ValueError("At least two schedulers are needed for a comparison")
+        if min_replicas < 2:
+            raise ValueError("min_replicas must be at least 2 to estimate a variance")
+        self.cluster = cluster
+        self.generator = generator
+        self.schedulers = schedulers
+        metrics = metrics or ["avg_waiting_time", "waiting_time_p99"]
+        self.metrics = {metric if isinstance(metric, str) else getattr(metric, "__name__", f"metric_{i}"): get_objective(metric)
+                        for i, metric in enumerate(metrics)}
+        self.ci_width = ci_width
+        self.relative = relative
+        self.confidence = confidence
+        self.min_replicas = min_replicas
+        self.max_replicas = max_replicas
+        self.base_seed = base_seed
+        self.engine = engine
+        self.replicas = 0
+        self.estimates = {}  # (scheduler name, metric) -> RunningStats of the metric
+        self.differences = {}  # (scheduler name, metric) -> RunningStats of scheduler minus baseline
+        self.stopped_at = {}  # (scheduler name, metric) -> replicas when the comparison stopped
+        self.results = []
+
+    def run(self, workers: int = None) -> list[dict]:
+        """
+        Run replicas until every comparison has stopped.
+
+        Replicas run in parallel but are folded into the intervals in seed order, so the stopping decisions
+        and results do not depend on the number of workers or on timing.
+
+        :param workers: Number of worker processes. None uses one per CPU; 1 runs serially in this process.
+        :return: One row per (scheduler, metric) comparison, also kept in ``self.results``.
+        """
+        baseline = self.schedulers[0].__name__
+        for scheduler in self.schedulers:
+            for metric in self.metrics:
+                self.estimates[(scheduler.__name__, metric)] = RunningStats()
+                if scheduler.__name__ != baseline:
+                    self.differences[(scheduler.__name__, metric)] = RunningStats()
+        self.replicas = 0
+        self.stopped_at = {}
+        print(f"Replicating {len(self.schedulers)} schedulers over up to {self.max_replicas} seeds...")
+
+        if workers == 1:
+            for replica in range(self.max_replicas):
+                active = self._active_schedulers()
+                if not active:
+                    break
+                self._fold(_run_replica(self.cluster, self.generator, self.base_seed + replica, active, self.engine))
+        else:
+            slots = workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=slots) as pool:
+                pending = {}  # replica -> future
+                done = {}  # replica -> results, waiting for the replicas before it
+                submitted = 0
+                while self.replicas < self.max_replicas and self._active_schedulers():
+                    # Keep every worker busy with the schedulers that are still compared
+                    while submitted < self.max_replicas and len(pending) + len(done) < slots:
+                        pending[submitted] = pool.submit(_run_replica, self.cluster, self.generator,
+                                                         self.base_seed + submitted, self._active_schedulers(),
+                                                         self.engine)
+                        submitted += 1
+                    finished, _ = wait(pending.values(), return_when=FIRST_COMPLETED)
+                    for replica in [r for r, future in pending.items() if future in finished]:
+                        done[replica] = pending.pop(replica).result()
+                    while self.replicas in done and self._active_schedulers():
+                        self._fold(done.pop(self.replicas))
+                for future in pending.values():
+                    future.cancel()
+
+        self.results = self._comparison_rows()
+        return self.results
+
+    def write_results(self, path: str):
+        """
+        Write the comparison table of the last run() call as CSV.
+        """
+        if not self.results:
+            raise ValueError("No results to write, call run() first")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(self.results[0]))
+            writer.writeheader()
+            writer.writerows(self.results)
+
+    def _active_schedulers(self) -> list:
+        # The baseline runs while any comparison is open, the others while one of their own is
+        active = [scheduler for scheduler in self.schedulers[1:]
+                  if any((scheduler.__name__, metric) not in self.stopped_at for metric in self.metrics)]
+        return [self.schedulers[0]] + active if active else []
+
+    def _fold(self, runs: dict):
+        # Add one replica, in seed order, to the estimates and the paired differences of the open comparisons
+        self.replicas += 1
+        baseline = self.schedulers[0].__name__
+        values = {name: {metric: score(results) for metric, score in self.metrics.items()}
+                  for name, results in runs.items()}
+        for name, metric_values in values.items():
+            for metric, value in metric_values.items():
+                key = (name, metric)
+                if key in self.stopped_at or (name == baseline and self._baseline_done(metric)):
+                    continue
+                self.estimates[key].add(value)
+                if name != baseline:
+                    self.differences[key].add(value - values[baseline][metric])
+        if self.replicas < self.min_replicas:
+            return
+        for key, stats in self.differences.items():
+            if key not in self.stopped_at and 2 * stats.half_width(self.confidence) <= self._target_width(key[1]):
+                self.stopped_at[key] = self.replicas
+                print(f"{key[0]} vs {baseline} on {key[1]}: interval reached the target after {self.replicas} replicas")
+
+    def _baseline_done(self, metric: str) -> bool:
+        return all((scheduler.__name__, metric) in self.stopped_at for scheduler in self.schedulers[1:])
+
+    def _target_width(self, metric: str) -> float:
+        width = self.ci_width[metric] if isinstance(self.ci_width, dict) else self.ci_width
+        if self.relative:
+            return width * abs(self.estimates[(self.schedulers[0].__name__, metric)].mean)
+        return width
+
+    def _comparison_rows(self) -> list[dict]:
+        baseline = self.schedulers[0].__name__
+        rows = []
+        for (name, metric), stats in self.differences.items():
+            half_width = stats.half_width(self.confidence)
+            mean = self.estimates[(name, metric)].mean
+            rows.append({
+                "scheduler": name,
+                "baseline": baseline,
+                "metric": metric,
+                "replicas": stats.count,
+                "mean": mean,
+                # The baseline over the same replicas, which may be fewer than the baseline ran
+                "baseline_mean": mean - stats.mean,
+                "mean_difference": stats.mean,
+                "ci_low": stats.mean - half_width,
+                "ci_high": stats.mean + half_width,
+                "ci_width": 2 * half_width,
+                "converged": (name, metric) in self.stopped_at,
+            })
+        return rows
+
+def t_quantile(p: float, df: int) -> float:
+    """
+    Quantile of Student's t distribution: exact for one and two degrees of freedom, otherwise from the
+    normal quantile with the Cornish-Fisher expansion (within 1% from 3 degrees of freedom on).
+    """
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = NormalDist().inv_cdf(p)
+    return (z + (z ** 3 + z) / (4 * df)
+            + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3))
+
+def _run_replica(cluster: Cluster, generator: JobGenerator, seed: int, schedulers: list, engine: str) -> dict:
+    # One trace, every scheduler: common random numbers. Runs in a worker process.
+    generator = copy.copy(generator)
+    generator.seed = seed
+    jobs = generator.generate_jobs()
+    runs = {}
+    for scheduler in schedulers:
+        results = simulate_point(cluster, jobs, scheduler, engine)
+        # Only what the metrics read, not the per-job rows
+        runs[scheduler.__name__] = {"summary": results["summary"], "distributions": results["distributions"]}
+    return runs
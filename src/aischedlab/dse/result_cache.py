@@ -0,0 +1,111 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Iterable, Optional
+
+from aischedlab.core.models import Cluster, Job, NODE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+JOB_KEY_FIELDS = ("name", "submit_time", "duration", "gpus", "cpus", "memory")
+# Bump whenever the layout of SimulationEngine.results() changes
+RESULTS_FORMAT = "5"
+
+def digest_cluster(cluster: Cluster) -> str:
+    """
+    Stable hash of a cluster definition: every node's name, resources, availability and power figures.
+    """
+    hasher = hashlib.sha256()
+    for node in cluster.nodes:
+        record = [node.name] + [float(getattr(node, column)) for column in NODE_COLUMNS]
+        hasher.update(json.dumps(record).encode())
+        hasher.update(b"\n")
+    return hasher.hexdigest()
+
+def digest_jobs(jobs: Iterable[Job]) -> str:
+    """
+    Stable hash of a job trace, fed one job at a time so large traces are never serialized as a whole.
+    """
+    hasher = hashlib.sha256()
+    for job in jobs:
+        hasher.update(json.dumps([getattr(job, field) for field in JOB_KEY_FIELDS]).encode())
+        hasher.update(b"\n")
+    return hasher.hexdigest()
+
+def cache_key(cluster_digest: str, jobs_digest: str, scheduler_cls: type, settings: dict) -> str:
+    """
+    Combine the cluster and trace digests, the scheduler class and version and the engine settings.
+
+    Bump a strategy's ``version`` attribute whenever its behavior changes to invalidate old results.
+    """
+    key = {
+        "cluster": cluster_digest,
+        "jobs": jobs_digest,
+        "scheduler": f"{scheduler_cls.__module__}.{scheduler_cls.__qualname__}",
+        "scheduler_version": str(getattr(scheduler_cls, "version", "")),
+        "settings": settings,
+        "results_format": RESULTS_FORMAT,
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+class ResultCache:
+    def __init__(self, directory: str = ".aischedlab_cache", max_bytes: int = 512 * 1024 ** 2):
+        """
+        Content-addressed on-disk store of simulation results.
+
+        Each entry is the JSON-encoded result of SimulationEngine.results(). Entries are evicted
+        least recently used first once the cache grows beyond ``max_bytes``.
+
+        :param directory: Cache directory, created on demand.
+        :param max_bytes: Size limit for all entries together.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                results = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        # The modification time doubles as the last access time for LRU eviction
+        os.utime(path)
+        logger.info(f"Result cache hit for {key}")
+        return results
+
+    def put(self, key: str, results: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(results, f)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache fits into ``max_bytes``.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            logger.info(f"Evicted {os.path.basename(path)} from the result cache")
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                os.remove(entry.path)
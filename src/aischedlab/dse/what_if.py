@@ -0,0 +1,65 @@
+import copy
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional
+
+from aischedlab.core.models import ArrayCluster, Cluster, Job, Node
+from aischedlab.core.simengine import SimulationEngine
+from aischedlab.core.snapshot import Snapshot
+
+def warm_up(cluster: Cluster, jobs: Iterable[Job], scheduler_cls: type, until: float, engine: str = "simpy") -> Snapshot:
+    """
+    Simulate the shared prefix of a set of experiments once and capture it at simulated time ``until``.
+    """
+    sim_engine = SimulationEngine(cluster=cluster, jobs=jobs, scheduler_cls=scheduler_cls, engine=engine)
+    if sim_engine.run(report=False, until=until):
+        raise ValueError(f"The simulation completed before time {until}, there is nothing to fork")
+    return sim_engine.snapshot()
+
+def simulate_variant(snapshot: Snapshot, scheduler_cls: Optional[type] = None, add_nodes: Optional[list[Node]] = None,
+                     engine: str = "simpy") -> dict:
+    """
+    Continue a snapshot with a changed strategy and/or extra nodes and return the results of the full run.
+
+    Works on a private copy of the snapshot.
+
+    :param scheduler_cls: Strategy for the rest of the run; defaults to the snapshot's.
+    :param add_nodes: Idle nodes that join the cluster at the snapshot time.
+    """
+    return _continue(copy.deepcopy(snapshot), scheduler_cls, add_nodes, engine)
+
+def fork(snapshot: Snapshot, variants: list[dict], workers: Optional[int] = None, engine: str = "simpy") -> list[dict]:
+    """
+    Run what-if variants from one snapshot in parallel, so N variants cost one prefix plus N suffixes.
+
+    :param variants: Keyword arguments of :func:`simulate_variant` per variant,
+                     e.g. ``[{"scheduler_cls": BackfillScheduler}, {"add_nodes": [Node(...)]}]``.
+    :param workers: Number of worker processes. None uses one per CPU; 1 runs serially in this process.
+    :return: The results of each variant, in the order of ``variants``.
+    """
+    if workers == 1:
+        return [simulate_variant(snapshot, engine=engine, **variant) for variant in variants]
+    # Pickle the snapshot once instead of once per submitted variant
+    payload = pickle.dumps(snapshot)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_simulate_pickled_variant, payload, engine, variant) for variant in variants]
+        return [future.result() for future in futures]
+
+def _simulate_pickled_variant(payload: bytes, engine: str, variant: dict) -> dict:
+    # Unpickling already yields a private copy
+    return _continue(pickle.loads(payload), variant.get("scheduler_cls"), variant.get("add_nodes"), engine)
+
+def _continue(snapshot: Snapshot, scheduler_cls: Optional[type], add_nodes: Optional[list[Node]], engine: str) -> dict:
+    if add_nodes:
+        if isinstance(snapshot.cluster, ArrayCluster):
+            raise ValueError("add_nodes needs a cluster of Node objects, not an ArrayCluster")
+        for node in copy.deepcopy(add_nodes):
+            # New nodes only draw power from the moment they join
+            node.energy_updated_at = snapshot.time
+            snapshot.cluster.nodes.append(node)
+        snapshot.cluster.refresh_counters()
+    # With new nodes, let the strategy use the new capacity right away
+    dispatch = True if add_nodes else None
+    sim_engine = SimulationEngine.from_snapshot(snapshot, scheduler_cls=scheduler_cls, engine=engine, dispatch=dispatch)
+    sim_engine.run(report=False)
+    return sim_engine.results()
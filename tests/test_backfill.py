@@ -0,0 +1,35 @@
+import pytest
+
+from aischedlab.core.models import Cluster, Job, Node
+from aischedlab.core.simengine import SimulationEngine
+from aischedlab.core.strategies import BackfillScheduler
+
+def build_cluster() -> Cluster:
+    return Cluster(nodes=[Node(name="node_0", gpus_total=8, cpus_total=64, memory_total=512,
+                               gpus_available=8, cpus_available=64, memory_available=512)])
+
+def build_jobs(infeasible: bool) -> list[Job]:
+    # Two 4-GPU jobs fill the node until t=10 and t=12, then a stream of 4-GPU jobs competes with an 8-GPU job
+    jobs = [Job(name="first_0", submit_time=0, duration=10, gpus=4),
+            Job(name="first_1", submit_time=0, duration=12, gpus=4)]
+    if infeasible:
+        jobs.append(Job(name="too_big", submit_time=1, duration=10, gpus=16))
+    jobs.append(Job(name="wide", submit_time=2, duration=5, gpus=8))
+    jobs.extend(Job(name=f"stream_{i}", submit_time=3 + i, duration=10, gpus=4) for i in range(20))
+    return jobs
+
+def waiting_times(jobs: list[Job], engine: str) -> dict:
+    sim_engine = SimulationEngine(cluster=build_cluster(), jobs=jobs, scheduler_cls=BackfillScheduler, engine=engine)
+    sim_engine.run(report=False)
+    return {job.name: job.waiting_time for job in jobs}
+
+@pytest.mark.parametrize("engine", ["simpy", "fast"])
+def test_head_job_is_protected(engine: str):
+    assert waiting_times(build_jobs(infeasible=False), engine)["wide"] == 10
+
+@pytest.mark.parametrize("engine", ["simpy", "fast"])
+def test_job_that_never_fits_does_not_hold_the_reservation(engine: str):
+    expected = waiting_times(build_jobs(infeasible=False), engine)
+    actual = waiting_times(build_jobs(infeasible=True), engine)
+    del actual["too_big"]  # Never starts
+    assert actual == expected
@@ -0,0 +1,33 @@
+import pytest
+
+from aischedlab.core.models import ArrayCluster, Cluster, Job, Node
+from aischedlab.core.simengine import SimulationEngine
+
+def build_node(**power) -> Node:
+    return Node(name="node_0", gpus_total=8, cpus_total=64, memory_total=512,
+                gpus_available=8, cpus_available=64, memory_available=512, **power)
+
+@pytest.mark.parametrize("kind", ["nodes", "array"])
+def test_energy_is_reported_in_kwh(kind: str):
+    # A fully loaded 3.6 kW node for 1000 s draws exactly 1 kWh
+    nodes = [build_node(power_idle=360.0, power_active=3600.0)]
+    cluster = Cluster(nodes=nodes) if kind == "nodes" else ArrayCluster.from_nodes(nodes)
+    jobs = [Job(name="full", submit_time=0, duration=1000, gpus=8, cpus=64, memory=512)]
+    sim_engine = SimulationEngine(cluster=cluster, jobs=jobs)
+    sim_engine.run(report=False)
+    results = sim_engine.results()
+    assert results["jobs"][0]["energy_kWh"] == pytest.approx(1.0)
+    assert results["nodes"][0]["active_energy_kWh"] == pytest.approx(1.0)
+    assert results["nodes"][0]["energy_consumed_kWh"] == pytest.approx(1.0)
+
+def test_transitions_are_charged_in_kwh():
+    # 0.5 kWh suspend, 1 kWh asleep, 0.25 kWh wake-up and 1 kWh idle
+    node = build_node(power_idle=3600.0, power_sleep=3600.0, sleep_energy=0.5, wake_energy=0.25)
+    cluster = Cluster(nodes=[node])
+    cluster.suspend(node, 0)
+    cluster.wake(node, 1000)
+    node.accrue_energy(2000)
+    assert node.energy_transition == pytest.approx(0.75)
+    assert node.energy_sleep == pytest.approx(1.0)
+    assert node.energy_idle == pytest.approx(1.0)
+    assert node.energy_consumption == pytest.approx(2.75)
@@ -0,0 +1,98 @@
+import pytest
+
+from aischedlab.core.models import ArrayCluster, Cluster, Job, Node
+from aischedlab.core.simengine import SimulationEngine
+from aischedlab.core.strategies import SCHEDULERS
+from aischedlab.dse.job_generator import JobGenerator
+
+SEEDS = (0, 1, 2)
+
+def build_nodes() -> list[Node]:
+    # Mixed node shapes with wake and suspend latencies, so power-managing strategies schedule wake-ups
+    nodes = []
+    for i in range(6):
+        gpus = 8 if i % 2 == 0 else 4
+        nodes.append(Node(name=f"node_{i}", gpus_total=gpus, cpus_total=64, memory_total=512,
+                          gpus_available=gpus, cpus_available=64, memory_available=512,
+                          power_idle=200.0, power_active=1500.0, power_sleep=20.0,
+                          sleep_latency=3.5, wake_latency=12.25, sleep_energy=0.01, wake_energy=0.02))
+    nodes.append(Node(name="cpu_0", gpus_total=0, cpus_total=32, memory_total=128,
+                      gpus_available=0, cpus_available=32, memory_available=128))
+    return nodes
+
+def build_jobs(seed: int) -> list:
+    generator = JobGenerator(
+        num_jobs_range=(300, 300),
+        submit_time_range=(0, 200),
+        duration_range=(1, 60),
+        gpu_range=(0, 8),
+        cpu_range=(1, 32),
+        memory_range=(1, 256),
+        seed=seed,
+        duration_distribution="lognormal",
+        gpu_choices=(0, 1, 2, 4, 8),
+        gpu_weights=(2, 8, 4, 2, 1),
+    )
+    jobs = generator.generate_jobs()
+    for job in jobs:
+        # Fractional submit times with ties: the clock reaches them through rounded arrival delays
+        job.submit_time = round(job.submit_time, 1)
+    return jobs
+
+def build_cluster(kind: str) -> Cluster:
+    nodes = build_nodes()
+    return Cluster(nodes=nodes) if kind == "nodes" else ArrayCluster.from_nodes(nodes)
+
+def run(kind: str, scheduler: str, seed: int, engine: str) -> dict:
+    sim_engine = SimulationEngine(cluster=build_cluster(kind), jobs=build_jobs(seed),
+                                  scheduler_cls=SCHEDULERS[scheduler], engine=engine)
+    sim_engine.run(report=False)
+    return sim_engine.results()
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("kind", ["nodes", "array"])
+@pytest.mark.parametrize("scheduler", list(SCHEDULERS))
+def test_fast_engine_matches_simpy(scheduler: str, kind: str, seed: int):
+    expected = run(kind, scheduler, seed, "simpy")
+    actual = run(kind, scheduler, seed, "fast")
+    assert actual["summary"]["jobs_completed"] == expected["summary"]["jobs_submitted"]
+    assert actual == expected
+
+@pytest.mark.parametrize("scheduler", list(SCHEDULERS))
+def test_array_cluster_matches_node_cluster(scheduler: str):
+    expected = run("nodes", scheduler, SEEDS[0], "fast")
+    actual = run("array", scheduler, SEEDS[0], "fast")
+    assert actual["jobs"] == expected["jobs"]
+    assert actual["summary"] == expected["summary"]
+
+@pytest.mark.parametrize("engine", ["simpy", "fast"])
+@pytest.mark.parametrize("scheduler", list(SCHEDULERS))
+def test_resumed_run_matches_uninterrupted(scheduler: str, engine: str):
+    expected = run("nodes", scheduler, SEEDS[0], engine)
+    sim_engine = SimulationEngine(cluster=build_cluster("nodes"), jobs=build_jobs(SEEDS[0]),
+                                  scheduler_cls=SCHEDULERS[scheduler], engine=engine)
+    assert not sim_engine.run(until=100, report=False)
+    snapshot = sim_engine.snapshot()
+    running = len(snapshot.running_jobs())
+    assert running > 0
+    resumed = SimulationEngine.from_snapshot(snapshot, engine=engine)
+    assert resumed.jobs_running == running
+    assert resumed.run(report=False)
+    assert resumed.jobs_running == 0
+    assert resumed.results() == expected
+
+def test_arrivals_at_rounded_times():
+    # 0.3 + (0.9 - 0.3) > 0.9: the clock lands past the second job's submit time, which is still in order
+    submit_times = [0.1, 0.3, 0.9, 0.9, 1.7, 2.5]
+    for engine in ("simpy", "fast"):
+        jobs = [Job(name=f"j{i}", submit_time=time, duration=1, gpus=1) for i, time in enumerate(submit_times)]
+        sim_engine = SimulationEngine(cluster=Cluster(nodes=build_nodes()), jobs=jobs, engine=engine)
+        sim_engine.run(report=False)
+        assert sim_engine.jobs_completed == len(submit_times)
+
+def test_unsorted_iterator_is_rejected():
+    jobs = iter([Job(name="late", submit_time=2.5, duration=1, gpus=1),
+                 Job(name="early", submit_time=1.5, duration=1, gpus=1)])
+    sim_engine = SimulationEngine(cluster=Cluster(nodes=build_nodes()), jobs=jobs, engine="fast")
+    with pytest.raises(ValueError):
+        sim_engine.run(report=False)